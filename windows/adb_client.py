@@ -0,0 +1,195 @@
+"""
+Minimal client for the adb server's smart-socket protocol.
+
+The adb server (started by any `adb` command) listens on 127.0.0.1:5037 and
+accepts requests of the form <4 hex digit length><service>. Talking to it
+directly avoids spawning an `adb` process for every query and lets us receive
+device changes push-style through `host:track-devices`.
+
+Protocol reference: SERVICES.TXT / OVERVIEW.TXT in the adb sources.
+"""
+
+from __future__ import annotations
+
+import re
+import socket
+from dataclasses import dataclass
+from typing import Iterator, List, Optional
+
+ADB_SERVER_HOST = "127.0.0.1"
+ADB_SERVER_PORT = 5037
+
+# One "<serial> <state> [usb:... product:... model:... ...]" entry per line; the
+# "List of devices attached" header printed by `adb devices` never matches
+# because its second word isn't a state. The model token is only present in
+# the long (-l) listing.
+_DEV_RE = re.compile(
+    rb"^(\S+)[ \t]+(device|offline|unauthorized|authorizing|connecting"
+    rb"|bootloader|recovery|rescue|sideload|host|no permissions)\b"
+    rb"(?:[^\n]*?[ \t]model:(\S+))?",
+    re.M,
+)
+
+
+@dataclass(frozen=True)
+class AdbDevice:
+    serial: str
+    status: str
+    model: Optional[str] = None  # Only known from long (-l) listings
+
+
+class AdbServerError(Exception):
+    """Raised when the adb server answers a request with FAIL."""
+
+
+def _recv_exact(sock: socket.socket, size: int) -> bytes:
+    data = bytearray()
+    while len(data) < size:
+        chunk = sock.recv(size - len(data))
+        if not chunk:
+            raise ConnectionError("adb server closed the connection")
+        data.extend(chunk)
+    return bytes(data)
+
+
+def _read_payload(sock: socket.socket) -> bytes:
+    """Reads one <4 hex digit length><payload> frame."""
+    length = int(_recv_exact(sock, 4), 16)
+    return _recv_exact(sock, length) if length else b""
+
+
+def _send_request(sock: socket.socket, service: str) -> None:
+    """Sends a service request and waits for OKAY, raising AdbServerError on FAIL."""
+    payload = service.encode("utf-8")
+    sock.sendall(b"%04x" % len(payload) + payload)
+
+    status = _recv_exact(sock, 4)
+    if status == b"OKAY":
+        return
+    if status == b"FAIL":
+        raise AdbServerError(_read_payload(sock).decode("utf-8", "replace"))
+    raise AdbServerError(f"unexpected adb server response: {status!r}")
+
+
+def _connect(timeout_s: float) -> socket.socket:
+    """Opens a connection to the local adb server (OSError if it is not running)."""
+    return socket.create_connection((ADB_SERVER_HOST, ADB_SERVER_PORT), timeout=timeout_s)
+
+
+def parse_device_list(payload: bytes) -> List[AdbDevice]:
+    """Parses the "serial\\tstate ...\\n" list sent by host:devices[-l] / host:track-devices[-l]."""
+    devices: List[AdbDevice] = []
+    for m in _DEV_RE.finditer(payload):
+        model = m.group(3)
+        devices.append(AdbDevice(
+            serial=m.group(1).decode("ascii", "replace"),
+            status=m.group(2).decode("ascii"),
+            # adb replaces spaces in the model name with underscores
+            model=model.decode("utf-8", "replace").replace("_", " ") if model else None,
+        ))
+    return devices
+
+
+class AdbServerClient:
+    """
+    Issues adb commands over the server socket instead of spawning `adb`.
+
+    The server closes the connection after answering each host request, so
+    every call opens its own (cheap, loopback) connection. All methods raise
+    OSError if the server is unreachable and AdbServerError if it rejects the
+    request (e.g. no device, unknown serial).
+    """
+
+    def __init__(self, host: str = ADB_SERVER_HOST, port: int = ADB_SERVER_PORT,
+                 timeout_s: float = 5):
+        self.host = host
+        self.port = port
+        self.timeout_s = timeout_s
+
+    def _open(self, timeout_s: Optional[float] = None) -> socket.socket:
+        return socket.create_connection(
+            (self.host, self.port),
+            timeout=self.timeout_s if timeout_s is None else timeout_s,
+        )
+
+    def devices(self, timeout_s: Optional[float] = None) -> List[AdbDevice]:
+        """Lists attached devices (long form, including model names)."""
+        with self._open(timeout_s) as sock:
+            _send_request(sock, "host:devices-l")
+            return parse_device_list(_read_payload(sock))
+
+    def forward(self, local_port: int, remote_port: int, timeout_s: Optional[float] = None) -> None:
+        """Forwards local tcp:<local_port> to the device, replacing any existing mapping."""
+        self._host_command(f"host:forward:tcp:{local_port};tcp:{remote_port}", timeout_s)
+
+    def forward_remove(self, local_port: int, timeout_s: Optional[float] = None) -> None:
+        """Removes the forward on local tcp:<local_port>."""
+        self._host_command(f"host:killforward:tcp:{local_port}", timeout_s)
+
+    def transport(self, sock: socket.socket, serial: str) -> None:
+        """Switches an open connection to the given device."""
+        _send_request(sock, f"host:transport:{serial}")
+
+    def shell(self, serial: str, command: str, timeout_s: Optional[float] = None) -> str:
+        """Runs a shell command on the given device and returns its output."""
+        with self._open(timeout_s) as sock:
+            self.transport(sock, serial)
+            _send_request(sock, f"shell:{command}")
+
+            output = bytearray()
+            while True:
+                chunk = sock.recv(4096)
+                if not chunk:
+                    break
+                output.extend(chunk)
+        return output.decode("utf-8", "replace")
+
+    def _host_command(self, service: str, timeout_s: Optional[float]) -> None:
+        # Forward commands answer twice: once for the transport, once for the result
+        with self._open(timeout_s) as sock:
+            _send_request(sock, service)
+            status = _recv_exact(sock, 4)
+            if status == b"FAIL":
+                raise AdbServerError(_read_payload(sock).decode("utf-8", "replace"))
+
+
+class DeviceTracker:
+    """
+    Streams device lists pushed by the adb server via host:track-devices.
+
+    The server sends the full list immediately and again on every change, so
+    iterating blocks until something happens instead of polling. Call close()
+    from another thread to stop the iteration.
+    """
+
+    def __init__(self, timeout_s: float = 2):
+        self._sock: Optional[socket.socket] = None
+        # The long form includes model names; older servers only know the short one
+        for service in ("host:track-devices-l", "host:track-devices"):
+            self._sock = _connect(timeout_s)
+            try:
+                _send_request(self._sock, service)
+                break
+            except AdbServerError:
+                self.close()
+                if service == "host:track-devices":
+                    raise
+            except Exception:
+                self.close()
+                raise
+        # Updates only arrive when devices change, so block indefinitely.
+        self._sock.settimeout(None)
+
+    def __iter__(self) -> Iterator[List[AdbDevice]]:
+        while self._sock is not None:
+            yield parse_device_list(_read_payload(self._sock))
+
+    def close(self) -> None:
+        sock, self._sock = self._sock, None
+        if sock is None:
+            return
+        try:
+            sock.shutdown(socket.SHUT_RDWR)
+        except OSError:
+            pass
+        sock.close()
@@ -9,64 +9,132 @@ so the user does not need to run setup_adb_forward.ps1 manually.
 from __future__ import annotations
 
 import shutil
+import socket
 import subprocess
 import sys
-from dataclasses import dataclass
+import time
 from typing import List, Optional
 
+from adb_client import AdbDevice, AdbServerClient, AdbServerError, parse_device_list
 
-@dataclass(frozen=True)
-class AdbDevice:
-    serial: str
-    status: str
 
+# Resolved path of the adb executable. shutil.which() scans every PATH entry
+# (with all PATHEXT permutations on Windows), so the result is cached and only
+# refreshed every _ADB_PATH_TTL_S seconds to pick up PATH changes.
+_ADB_PATH: Optional[str] = None
+_ADB_PATH_CHECKED_AT: Optional[float] = None
+_ADB_PATH_TTL_S = 30.0
 
-def _get_subprocess_flags() -> dict:
-    """
-    Returns subprocess flags to hide console window on Windows.
-    This prevents a command prompt from flashing when running ADB commands.
-    """
-    flags = {
-        "capture_output": True,
-        "text": True,
-        "check": False,
-    }
 
-    # On Windows, hide the console window
-    if sys.platform == "win32":
-        # CREATE_NO_WINDOW flag prevents console window from appearing
-        flags["creationflags"] = subprocess.CREATE_NO_WINDOW
+def _adb_path() -> Optional[str]:
+    """Returns the absolute path of adb, or None if it is not on PATH."""
+    global _ADB_PATH, _ADB_PATH_CHECKED_AT
+
+    now = time.monotonic()
+    if _ADB_PATH_CHECKED_AT is None or now - _ADB_PATH_CHECKED_AT >= _ADB_PATH_TTL_S:
+        _ADB_PATH = shutil.which("adb")
+        _ADB_PATH_CHECKED_AT = now
+    return _ADB_PATH
+
+
+# Per-command timeouts. Local-only commands (device list, forwards) answer in
+# milliseconds, so a long wait there only means the adb server is wedged and
+# would freeze the caller (possibly the UI thread). getprop goes over USB.
+DEVICES_TIMEOUT_S = 2
+FORWARD_TIMEOUT_S = 1
+SHELL_TIMEOUT_S = 5
+
 
-    return flags
+# subprocess.run() keyword arguments shared by every adb invocation.
+_BASE_FLAGS: dict = {
+    "capture_output": True,
+    "check": False,
+}
+# On Windows, hide the console window so a command prompt doesn't flash
+# when running ADB commands.
+if sys.platform == "win32":
+    _BASE_FLAGS["creationflags"] = subprocess.CREATE_NO_WINDOW
 
 
-def _run_adb(args: List[str], timeout_s: int = 5) -> subprocess.CompletedProcess[str]:
-    flags = _get_subprocess_flags()
-    flags["timeout"] = timeout_s
-    return subprocess.run(args, **flags)
+def _run_adb(args: List[str], timeout_s: int = 5, text: bool = True) -> subprocess.CompletedProcess:
+    # Invoke the resolved absolute path so CreateProcess skips its own PATH search.
+    return subprocess.run(
+        [_adb_path() or args[0], *args[1:]],
+        timeout=timeout_s,
+        text=text,
+        **_BASE_FLAGS,
+    )
 
 
 def adb_is_available() -> bool:
-    return shutil.which("adb") is not None
+    return _adb_path() is not None
+
+
+# Commands go straight to the adb server socket when it is running; spawning
+# `adb` is only the fallback. If the server isn't up it is started once; the
+# flag is cleared when that works or when we kill the server ourselves.
+_SERVER = AdbServerClient()
+_SERVER_START_ATTEMPTED = False
+
+
+def _server_call(method, *args, **kwargs):
+    """
+    Calls an AdbServerClient method, starting the adb server once if needed.
+
+    Raises subprocess.TimeoutExpired if the server accepts but doesn't answer
+    in time (same as a hung adb executable, so callers count it the same way),
+    and OSError if the server is still unreachable.
+    """
+    global _SERVER_START_ATTEMPTED
+
+    try:
+        return _timed_server_call(method, *args, **kwargs)
+    except ConnectionRefusedError:
+        # Nothing listening: the server isn't running. Any other failure means
+        # it is there but misbehaving, and starting it again won't help.
+        if _SERVER_START_ATTEMPTED or not adb_is_available():
+            raise
+
+    _SERVER_START_ATTEMPTED = True
+    _run_adb(["adb", "start-server"], timeout_s=10)
+    result = _timed_server_call(method, *args, **kwargs)
+    # Running again: if it dies later, starting it is worth another try
+    _SERVER_START_ATTEMPTED = False
+    return result
+
+
+def _timed_server_call(method, *args, **kwargs):
+    """Calls an AdbServerClient method, reporting socket timeouts as TimeoutExpired."""
+    try:
+        return method(*args, **kwargs)
+    except socket.timeout as e:
+        raise subprocess.TimeoutExpired(
+            f"adb server: {method.__name__}", kwargs.get("timeout_s")
+        ) from e
 
 
 def list_connected_devices() -> List[AdbDevice]:
+    """
+    Lists devices known to adb.
+    Raises subprocess.TimeoutExpired if the adb executable hangs.
+    """
+    try:
+        return _server_call(_SERVER.devices, timeout_s=DEVICES_TIMEOUT_S)
+    except AdbServerError:
+        return []
+    except OSError:
+        pass
+
     if not adb_is_available():
         return []
 
-    proc = _run_adb(["adb", "devices"], timeout_s=5)
+    # Keep stdout as bytes and let a single regex pick out (serial, status, model).
+    # The long listing carries the model name, saving a getprop per device.
+    proc = _run_adb(["adb", "devices", "-l"], timeout_s=DEVICES_TIMEOUT_S, text=False)
     if proc.returncode != 0:
         return []
 
-    devices: List[AdbDevice] = []
-    for line in proc.stdout.splitlines():
-        line = line.strip()
-        if not line or line.lower().startswith("list of devices"):
-            continue
-        parts = line.split()
-        if len(parts) >= 2:
-            devices.append(AdbDevice(serial=parts[0], status=parts[1]))
-    return devices
+    return parse_device_list(proc.stdout)
 
 
 def has_ready_usb_device() -> bool:
@@ -78,10 +146,27 @@ def get_device_name(serial: str) -> str:
     Gets the friendly device name (model) for a given serial.
     Returns the serial if the name cannot be retrieved.
     """
+    # Ask the adb server directly; fall back to spawning adb if it isn't running.
+    try:
+        name = _server_call(
+            _SERVER.shell, serial, "getprop ro.product.model", timeout_s=SHELL_TIMEOUT_S
+        ).strip()
+        return name or serial
+    except (AdbServerError, subprocess.TimeoutExpired):
+        return serial
+    except OSError:
+        pass
+
     if not adb_is_available():
         return serial
 
-    proc = _run_adb(["adb", "-s", serial, "shell", "getprop", "ro.product.model"], timeout_s=5)
+    try:
+        proc = _run_adb(
+            ["adb", "-s", serial, "shell", "getprop", "ro.product.model"],
+            timeout_s=SHELL_TIMEOUT_S,
+        )
+    except subprocess.TimeoutExpired:
+        return serial
     if proc.returncode == 0 and proc.stdout.strip():
         return proc.stdout.strip()
     return serial
@@ -92,16 +177,52 @@ def ensure_port_forward(local_port: int, remote_port: int) -> bool:
     Creates/refreshes adb port forwarding.
     Returns True if a forward exists after this call.
     """
+    try:
+        try:
+            _server_call(_SERVER.forward, local_port, remote_port, timeout_s=FORWARD_TIMEOUT_S)
+        except AdbServerError:
+            # Same recovery as the subprocess path below: drop the old forward, retry once
+            try:
+                _timed_server_call(_SERVER.forward_remove, local_port, timeout_s=FORWARD_TIMEOUT_S)
+            except AdbServerError:
+                pass
+            _timed_server_call(_SERVER.forward, local_port, remote_port, timeout_s=FORWARD_TIMEOUT_S)
+        return True
+    except (AdbServerError, subprocess.TimeoutExpired):
+        return False
+    except OSError:
+        pass
+
     if not adb_is_available():
         return False
 
-    # If there is no authorized device, don't try to forward.
-    if not has_ready_usb_device():
+    # No separate "adb devices" probe: "adb forward" fails on its own when no
+    # authorized device is attached, and it replaces an existing mapping on the
+    # same local port, so the common case needs a single subprocess.
+    forward_args = ["adb", "forward", f"tcp:{local_port}", f"tcp:{remote_port}"]
+    try:
+        proc = _run_adb(forward_args, timeout_s=FORWARD_TIMEOUT_S)
+        if proc.returncode == 0:
+            return True
+
+        # Older adb versions may refuse to rebind; remove the stale forward and retry once.
+        _run_adb(["adb", "forward", "--remove", f"tcp:{local_port}"], timeout_s=FORWARD_TIMEOUT_S)
+        proc = _run_adb(forward_args, timeout_s=FORWARD_TIMEOUT_S)
+        return proc.returncode == 0
+    except subprocess.TimeoutExpired:
         return False
 
-    # Remove existing forward on local port (if any), then add.
-    _run_adb(["adb", "forward", "--remove", f"tcp:{local_port}"], timeout_s=5)
 
-    proc = _run_adb(["adb", "forward", f"tcp:{local_port}", f"tcp:{remote_port}"], timeout_s=5)
-    return proc.returncode == 0
+def kill_adb_server() -> None:
+    """Kills the adb server (documented recovery when it stops responding)."""
+    global _SERVER_START_ATTEMPTED
 
+    if not adb_is_available():
+        return
+    # The next server call must be allowed to start it again; otherwise every
+    # call falls back to `adb`, which rarely cold-starts the daemon in time
+    _SERVER_START_ATTEMPTED = False
+    try:
+        _run_adb(["adb", "kill-server"], timeout_s=5)
+    except subprocess.TimeoutExpired:
+        pass
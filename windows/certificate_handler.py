@@ -1,10 +1,27 @@
 """
 Manejo de certificados TLS para conexión segura con Android
 """
+import base64
+import re
 import ssl
 import socket
 from pathlib import Path
-from typing import Optional
+from typing import Dict, Optional, Tuple
+
+# Cuerpo base64 del primer bloque PEM del archivo
+_PEM_RE = re.compile(rb"-----BEGIN [^-]+-----\s*(.*?)\s*-----END", re.S)
+
+# cryptography tarda en importarse; se carga solo cuando se necesita
+_x509 = None
+
+
+def _get_x509():
+    """Importa cryptography.x509 la primera vez que se usa"""
+    global _x509
+    if _x509 is None:
+        from cryptography import x509
+        _x509 = x509
+    return _x509
 
 
 class CertificateHandler:
@@ -12,7 +29,17 @@ class CertificateHandler:
 
     def __init__(self, cert_path: Optional[Path] = None):
         self.cert_path = cert_path
+        # Certificado en formato DER (bytes decodificados del PEM)
         self.certificate: Optional[bytes] = None
+        # Caché de get_certificate_info (se invalida al cambiar el archivo)
+        self._parsed_cert = None
+        self._cert_mtime: float = 0.0
+        self._cert_info: Optional[dict] = None
+        # Contextos SSL ya creados, por (verify_cert, ruta, mtime del certificado)
+        self._ctx_cache: Dict[Tuple, ssl.SSLContext] = {}
+        # Última sesión TLS por servidor (host, puerto), con el contexto que la
+        # creó; permite reanudar el handshake al reconectar
+        self._sessions: Dict[Tuple[str, int], Tuple[ssl.SSLContext, ssl.SSLSession]] = {}
 
     def load_certificate(self, cert_path: Path) -> bool:
         """
@@ -25,15 +52,17 @@ class CertificateHandler:
             True si se cargó correctamente, False en caso contrario
         """
         try:
-            with open(cert_path, 'r') as f:
-                cert_content = f.read()
-                # Extraer solo el contenido del certificado (sin headers PEM)
-                cert_lines = [line for line in cert_content.split('\n')
-                             if line and not line.startswith('-----')]
-                cert_b64 = ''.join(cert_lines)
-                self.certificate = cert_b64.encode('utf-8')
-                self.cert_path = cert_path
-                return True
+            cert_path = Path(cert_path)
+            match = _PEM_RE.search(cert_path.read_bytes())
+            if not match:
+                print(f"Error al cargar certificado: no hay bloque PEM en {cert_path}")
+                return False
+            self.certificate = base64.b64decode(match.group(1))
+            self.cert_path = cert_path
+            self._cert_mtime = cert_path.stat().st_mtime
+            self._parsed_cert = None
+            self._cert_info = None
+            return True
         except Exception as e:
             print(f"Error al cargar certificado: {e}")
             return False
@@ -48,7 +77,21 @@ class CertificateHandler:
         Returns:
             Contexto SSL configurado
         """
+        cert_mtime = 0
+        if self.cert_path:
+            try:
+                cert_mtime = Path(self.cert_path).stat().st_mtime_ns
+            except OSError:
+                pass
+        cache_key = (verify_cert, str(self.cert_path) if self.cert_path else None, cert_mtime)
+
+        # Crear un contexto es caro (carga de CAs, cifrados); se reutiliza entre conexiones
+        cached = self._ctx_cache.get(cache_key)
+        if cached is not None:
+            return cached
+
         context = ssl.create_default_context()
+        context.options |= ssl.OP_NO_COMPRESSION
 
         # Forzar TLS 1.3
         context.minimum_version = ssl.TLSVersion.TLSv1_3
@@ -68,8 +111,29 @@ class CertificateHandler:
                 context.check_hostname = False
                 context.verify_mode = ssl.CERT_NONE
 
+        self._ctx_cache[cache_key] = context
         return context
 
+    def get_session(self, host: str, port: int,
+                    context: ssl.SSLContext) -> Optional[ssl.SSLSession]:
+        """
+        Devuelve la sesión TLS guardada para el servidor, si fue creada con
+        el mismo contexto (una sesión solo se puede reanudar con su contexto)
+        """
+        entry = self._sessions.get((host, port))
+        if entry and entry[0] is context:
+            return entry[1]
+        return None
+
+    def store_session(self, host: str, port: int, ssl_socket: ssl.SSLSocket):
+        """Guarda la sesión de una conexión para reanudarla en la siguiente"""
+        try:
+            session = ssl_socket.session
+        except (AttributeError, ValueError, OSError):
+            return
+        if session is not None and session.has_ticket:
+            self._sessions[(host, port)] = (ssl_socket.context, session)
+
     def get_certificate_info(self) -> Optional[dict]:
         """
         Obtiene información del certificado cargado
@@ -77,25 +141,33 @@ class CertificateHandler:
         Returns:
             Diccionario con información del certificado o None
         """
-        if not self.cert_path or not self.cert_path.exists():
+        if not self.cert_path:
             return None
 
         try:
-            import cryptography.x509
-            from cryptography import x509
-            from cryptography.hazmat.backends import default_backend
-
-            with open(self.cert_path, 'rb') as f:
-                cert_data = f.read()
-                cert = x509.load_pem_x509_certificate(cert_data, default_backend())
-
-                return {
-                    'subject': cert.subject.rfc4514_string(),
-                    'issuer': cert.issuer.rfc4514_string(),
-                    'serial_number': str(cert.serial_number),
-                    'not_valid_before': cert.not_valid_before.isoformat(),
-                    'not_valid_after': cert.not_valid_after.isoformat(),
-                }
+            mtime = self.cert_path.stat().st_mtime
+        except OSError:
+            return None
+
+        if self._cert_info is not None and mtime == self._cert_mtime:
+            return self._cert_info
+
+        try:
+            # Releer el archivo solo si cambió o nunca se cargó; si no, usar el DER ya cargado
+            if self.certificate is None or mtime != self._cert_mtime:
+                if not self.load_certificate(self.cert_path):
+                    return None
+            cert = _get_x509().load_der_x509_certificate(self.certificate)
+
+            self._parsed_cert = cert
+            self._cert_info = {
+                'subject': cert.subject.rfc4514_string(),
+                'issuer': cert.issuer.rfc4514_string(),
+                'serial_number': str(cert.serial_number),
+                'not_valid_before': cert.not_valid_before.isoformat(),
+                'not_valid_after': cert.not_valid_after.isoformat(),
+            }
+            return self._cert_info
         except Exception as e:
             print(f"Error al obtener información del certificado: {e}")
             return None
@@ -2,9 +2,18 @@
 Gestión de configuración de la aplicación Windows
 """
 import json
+import os
+import threading
 from pathlib import Path
-from typing import Optional, Dict, Any
-from dataclasses import dataclass, asdict
+from typing import Optional, Dict, Any, Tuple
+from dataclasses import dataclass, asdict, fields
+
+# msgspec decodifica/codifica directamente el dataclass sin dict intermedio
+try:
+    import msgspec
+    HAS_MSGSPEC = True
+except ImportError:
+    HAS_MSGSPEC = False
 
 
 @dataclass
@@ -21,6 +30,27 @@ class AppConfig:
     fps: int = 30
 
 
+def _encode_config(config: AppConfig) -> bytes:
+    """Serializa la configuración a JSON legible"""
+    if HAS_MSGSPEC:
+        return msgspec.json.format(msgspec.json.encode(config), indent=2)
+    return json.dumps(asdict(config), indent=2).encode('utf-8')
+
+
+def _decode_config(raw: bytes) -> AppConfig:
+    """Parsea la configuración ignorando campos desconocidos (configs de otras versiones)"""
+    if HAS_MSGSPEC:
+        try:
+            # strict=False acepta lo que un usuario escribe a mano ("fps": 30.0,
+            # "server_port": "8443") igual que el AppConfig(**datos) original
+            return msgspec.json.decode(raw, type=AppConfig, strict=False)
+        except msgspec.ValidationError:
+            pass  # Tipos que msgspec no convierte: se cargan sin validar, como antes
+    data = json.loads(raw)
+    known = {f.name for f in fields(AppConfig)}
+    return AppConfig(**{k: v for k, v in data.items() if k in known})
+
+
 class ConfigManager:
     """Gestor de configuración persistente"""
 
@@ -31,23 +61,40 @@ class ConfigManager:
         self.config_file = config_file
         self.config_file.parent.mkdir(parents=True, exist_ok=True)
         self._config: Optional[AppConfig] = None
+        # (st_mtime_ns, st_size) del archivo cuando se leyó/escribió por última vez
+        self._file_signature: Optional[Tuple[int, int]] = None
+        # Último contenido escrito/leído, para no reescribir si no cambió
+        self._last_bytes: Optional[bytes] = None
+        # Serializa las escrituras (todas usan el mismo archivo .tmp)
+        self._save_lock = threading.Lock()
+
+    def _stat_signature(self) -> Optional[Tuple[int, int]]:
+        try:
+            st = self.config_file.stat()
+        except OSError:
+            return None
+        return (st.st_mtime_ns, st.st_size)
 
     def load(self) -> AppConfig:
-        """Carga la configuración desde el archivo"""
-        if self._config is not None:
+        """Carga la configuración desde el archivo (solo relee si el archivo cambió)"""
+        signature = self._stat_signature()
+        if self._config is not None and signature == self._file_signature:
             return self._config
 
-        if self.config_file.exists():
+        if signature is not None:
             try:
-                with open(self.config_file, 'r') as f:
-                    data = json.load(f)
-                    self._config = AppConfig(**data)
-                    return self._config
+                raw = self.config_file.read_bytes()
+                self._config = _decode_config(raw)
+                self._last_bytes = raw
+                self._file_signature = signature
+                return self._config
             except Exception as e:
                 print(f"Error al cargar configuración: {e}")
 
         # Configuración por defecto
-        self._config = AppConfig()
+        if self._config is None:
+            self._config = AppConfig()
+        self._file_signature = signature
         return self._config
 
     def save(self, config: AppConfig) -> bool:
@@ -60,15 +107,27 @@ class ConfigManager:
         Returns:
             True si se guardó correctamente
         """
-        try:
-            self.config_file.parent.mkdir(parents=True, exist_ok=True)
-            with open(self.config_file, 'w') as f:
-                json.dump(asdict(config), f, indent=2)
-            self._config = config
-            return True
-        except Exception as e:
-            print(f"Error al guardar configuración: {e}")
-            return False
+        with self._save_lock:
+            try:
+                new_bytes = _encode_config(config)
+                self._config = config
+
+                # Nada que escribir si el contenido es idéntico al del disco
+                if new_bytes == self._last_bytes and self._stat_signature() == self._file_signature:
+                    return True
+
+                # Escritura atómica: archivo temporal + os.replace
+                self.config_file.parent.mkdir(parents=True, exist_ok=True)
+                tmp_file = self.config_file.with_name(self.config_file.name + '.tmp')
+                tmp_file.write_bytes(new_bytes)
+                os.replace(tmp_file, self.config_file)
+
+                self._last_bytes = new_bytes
+                self._file_signature = self._stat_signature()
+                return True
+            except Exception as e:
+                print(f"Error al guardar configuración: {e}")
+                return False
 
     def get(self) -> AppConfig:
         """Obtiene la configuración actual"""
@@ -2,18 +2,21 @@
 Device discovery for VanCamera.
 
 Discovers Android devices via:
-- USB: Polling ADB for connected devices
+- USB: Device-change notifications from the adb server (polling ADB as fallback)
 - WiFi: Listening for mDNS services (_vancamera._tcp)
 """
 
 from __future__ import annotations
 
+import subprocess
 import threading
-import time
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass
 from typing import Callable, Dict, List, Optional
 
-from adb_forward import adb_is_available, list_connected_devices, get_device_name
+from adb_client import AdbDevice, AdbServerError, DeviceTracker
+from adb_forward import adb_is_available, get_device_name, kill_adb_server, list_connected_devices
+from usb_events import UsbEventListener
 
 
 @dataclass
@@ -38,11 +41,18 @@ class DeviceDiscovery:
     """
     Discovers and tracks available VanCamera devices.
 
-    Supports USB devices via ADB polling and WiFi devices via mDNS.
+    Supports USB devices via the adb server (or ADB polling) and WiFi devices via mDNS.
     """
 
     DEFAULT_PORT = 8443
     USB_POLL_INTERVAL_S = 2.0
+    # While no device shows up, the poll interval doubles every few idle polls
+    USB_POLL_MAX_INTERVAL_S = 16.0
+    USB_POLL_IDLE_STEP = 4
+    # With OS device-change notifications, polling is only a keepalive
+    USB_KEEPALIVE_INTERVAL_S = 30.0
+    # Consecutive adb timeouts before the (presumably wedged) server is killed
+    ADB_TIMEOUTS_BEFORE_RESTART = 3
 
     def __init__(self):
         self._devices: Dict[str, DiscoveredDevice] = {}
@@ -52,11 +62,21 @@ class DeviceDiscovery:
         # USB polling
         self._usb_poll_thread: Optional[threading.Thread] = None
         self._usb_poll_running = False
+        self._usb_tracker: Optional[DeviceTracker] = None
+        self._usb_wake = threading.Event()  # Interrupts the poll sleep
+        self._usb_events = UsbEventListener(self._usb_wake.set)
+        self._usb_events_active = False
+        # Model names never change for a serial, so look each one up only once
+        self._name_cache: Dict[str, str] = {}
+        # Resolves several new devices' names in parallel (created on demand)
+        self._name_pool: Optional[ThreadPoolExecutor] = None
 
         # WiFi/mDNS discovery
         self._zeroconf = None
         self._browser = None
         self._mdns_running = False
+        # zeroconf.IPVersion.V4Only, bound when mDNS starts (zeroconf loads lazily)
+        self._ipv4_only = None
 
     def start(self):
         """Starts all discovery mechanisms."""
@@ -78,68 +98,165 @@ class DeviceDiscovery:
             return
 
         self._usb_poll_running = True
+        self._usb_wake.clear()
+        self._usb_events_active = self._usb_events.start()
         self._usb_poll_thread = threading.Thread(target=self._usb_poll_loop, daemon=True)
         self._usb_poll_thread.start()
 
     def stop_usb_polling(self):
         """Stops USB device polling."""
         self._usb_poll_running = False
+        self._usb_wake.set()
+        self._usb_events.stop()
+        self._usb_events_active = False
+        tracker = self._usb_tracker
+        if tracker:
+            tracker.close()  # Unblocks the tracking thread
         if self._usb_poll_thread and self._usb_poll_thread.is_alive():
             self._usb_poll_thread.join(timeout=3)
         self._usb_poll_thread = None
+        if self._name_pool:
+            self._name_pool.shutdown(wait=False)
+            self._name_pool = None
 
     def _usb_poll_loop(self):
         """Polling loop for USB devices."""
+        idle_polls = 0
+        last_devices: Optional[List[AdbDevice]] = None
+        adb_timeouts = 0
+
         while self._usb_poll_running:
+            # Prefer push updates from the adb server; this only returns once
+            # the server connection is lost (or was never available).
+            self._track_usb_devices()
+            if not self._usb_poll_running:
+                break
+
+            # Fallback: poll through the adb executable, which also (re)starts
+            # the adb server so tracking can resume on the next iteration.
             try:
-                self._update_usb_devices()
+                devices = self._update_usb_devices()
+                if not devices and devices == last_devices:
+                    idle_polls += 1
+                else:
+                    idle_polls = 0
+                last_devices = devices
+                adb_timeouts = 0
+            except subprocess.TimeoutExpired:
+                adb_timeouts += 1
+                print(f"USB poll: adb timed out ({adb_timeouts}x)")
+                # Watchdog: restart the adb server once per stall
+                if adb_timeouts == self.ADB_TIMEOUTS_BEFORE_RESTART:
+                    print("USB poll: restarting unresponsive adb server")
+                    kill_adb_server()
             except Exception as e:
                 print(f"USB poll error: {e}")
 
-            time.sleep(self.USB_POLL_INTERVAL_S)
+            # Woken early by a USB insert/remove notification (or by stop)
+            if self._usb_wake.wait(self._usb_poll_delay(idle_polls)):
+                self._usb_wake.clear()
+                idle_polls = 0
+
+    def _usb_poll_delay(self, idle_polls: int) -> float:
+        """Returns the poll interval: 2s while active, backing off to 16s when idle."""
+        if self._usb_events_active:
+            return self.USB_KEEPALIVE_INTERVAL_S
+        backoff = 1 << min(idle_polls // self.USB_POLL_IDLE_STEP, 3)
+        return min(self.USB_POLL_INTERVAL_S * backoff, self.USB_POLL_MAX_INTERVAL_S)
+
+    def _track_usb_devices(self):
+        """Applies device lists pushed by the adb server until the connection drops."""
+        try:
+            tracker = DeviceTracker()
+        except (OSError, AdbServerError):
+            return  # adb server not running
+
+        self._usb_tracker = tracker
+        try:
+            if not self._usb_poll_running:
+                return
+            for adb_devices in tracker:
+                if not self._usb_poll_running:
+                    break
+                self._apply_usb_devices(adb_devices)
+        except (OSError, AdbServerError) as e:
+            if self._usb_poll_running:
+                print(f"adb server connection lost: {e}")
+        except Exception as e:
+            print(f"USB tracking error: {e}")
+        finally:
+            self._usb_tracker = None
+            tracker.close()
 
-    def _update_usb_devices(self):
-        """Updates the list of USB devices from ADB."""
+    def _update_usb_devices(self) -> List[AdbDevice]:
+        """Updates the list of USB devices from ADB and returns the ADB device list."""
         if not adb_is_available():
             # Remove all USB devices if ADB is not available
             self._remove_devices_by_type("usb")
-            return
+            return []
 
-        # Get current USB devices
         adb_devices = list_connected_devices()
-        current_usb_ids = set()
+        self._apply_usb_devices(adb_devices)
+        return adb_devices
 
-        for adb_dev in adb_devices:
-            if adb_dev.status != "device":
-                continue  # Skip unauthorized or offline devices
+    def _apply_usb_devices(self, adb_devices: List[AdbDevice]):
+        """Syncs tracked USB devices with the given ADB device list."""
+        # Skip unauthorized or offline devices
+        ready = [d for d in adb_devices if d.status == "device"]
+        current_usb_ids = {f"usb:{d.serial}" for d in ready}
 
-            device_id = f"usb:{adb_dev.serial}"
-            current_usb_ids.add(device_id)
+        with self._lock:
+            new_devices = [d for d in ready if f"usb:{d.serial}" not in self._devices]
+
+        # Long listings already carry the model; otherwise resolve it outside
+        # the lock since it may hit the device over USB
+        names = {d.serial: d.model for d in new_devices if d.model}
+        unnamed = [d.serial for d in new_devices if not d.model]
+        if len(unnamed) > 1:
+            # Several devices appeared at once: query them concurrently
+            if self._name_pool is None:
+                self._name_pool = ThreadPoolExecutor(max_workers=4, thread_name_prefix="adb-name")
+            names.update(zip(unnamed, self._name_pool.map(self._get_usb_device_name, unnamed)))
+        else:
+            names.update((serial, self._get_usb_device_name(serial)) for serial in unnamed)
 
-            # Only add if not already tracked
-            with self._lock:
+        # Apply all additions and removals at once, then notify a single time
+        with self._lock:
+            changed = False
+            for adb_dev in new_devices:
+                device_id = f"usb:{adb_dev.serial}"
                 if device_id not in self._devices:
-                    friendly_name = get_device_name(adb_dev.serial)
-                    device = DiscoveredDevice(
+                    self._devices[device_id] = DiscoveredDevice(
                         id=device_id,
-                        name=friendly_name,
+                        name=names[adb_dev.serial],
                         type="usb",
                         address="127.0.0.1",
                         port=self.DEFAULT_PORT,
                     )
-                    self._devices[device_id] = device
-                    self._notify_change()
+                    changed = True
 
-        # Remove USB devices that are no longer connected
-        with self._lock:
+            # Remove USB devices that are no longer connected
             to_remove = [
                 dev_id for dev_id, dev in self._devices.items()
                 if dev.type == "usb" and dev_id not in current_usb_ids
             ]
-            if to_remove:
-                for dev_id in to_remove:
-                    del self._devices[dev_id]
-                self._notify_change()
+            for dev_id in to_remove:
+                del self._devices[dev_id]
+                changed = True
+
+            snapshot = list(self._devices.values()) if changed else None
+
+        if snapshot is not None:
+            self._notify_change(snapshot)
+
+    def _get_usb_device_name(self, serial: str) -> str:
+        """Returns the device model for a serial, querying ADB only on cache miss."""
+        name = self._name_cache.get(serial)
+        if name is None:
+            name = get_device_name(serial)
+            if name != serial:  # Lookup failed; retry next time the device shows up
+                self._name_cache[serial] = name
+        return name
 
     def _remove_devices_by_type(self, device_type: str):
         """Removes all devices of a given type."""
@@ -163,7 +280,10 @@ class DeviceDiscovery:
             return
 
         try:
-            from zeroconf import ServiceBrowser, Zeroconf, ServiceListener
+            from zeroconf import IPVersion, ServiceBrowser, Zeroconf, ServiceListener
+
+            # VideoReceiver connects over an AF_INET socket: IPv4 addresses only
+            self._ipv4_only = IPVersion.V4Only
 
             class VanCameraListener(ServiceListener):
                 def __init__(self, discovery: DeviceDiscovery):
@@ -214,16 +334,15 @@ class DeviceDiscovery:
     def _on_mdns_service_added(self, zc, type_: str, name: str):
         """Called when an mDNS service is discovered."""
         try:
-            import socket
             info = zc.get_service_info(type_, name)
             if not info:
                 return
 
-            # Get IP address
-            if info.addresses:
-                ip_address = socket.inet_ntoa(info.addresses[0])
-            else:
+            # Get IP address (already formatted by zeroconf), IPv4 only
+            addresses = info.parsed_addresses(self._ipv4_only)
+            if not addresses:
                 return
+            ip_address = addresses[0]
 
             # Extract friendly name from service name (e.g., "VanCamera-Pixel8" -> "Pixel8")
             friendly_name = name.replace("VanCamera-", "").replace(f".{type_}", "")
@@ -232,14 +351,20 @@ class DeviceDiscovery:
 
             device_id = f"wifi:{name}"
 
+            device = DiscoveredDevice(
+                id=device_id,
+                name=friendly_name,
+                type="wifi",
+                address=ip_address,
+                port=info.port,
+            )
+
             with self._lock:
-                self._devices[device_id] = DiscoveredDevice(
-                    id=device_id,
-                    name=friendly_name,
-                    type="wifi",
-                    address=ip_address,
-                    port=info.port,
-                )
+                # Zeroconf re-announces services on TTL refresh; ignore
+                # updates that don't change anything
+                if self._devices.get(device_id) == device:
+                    return
+                self._devices[device_id] = device
                 self._notify_change()
 
             print(f"mDNS: Discovered {friendly_name} at {ip_address}:{info.port}")
@@ -282,9 +407,14 @@ class DeviceDiscovery:
         """
         self._callbacks.append(callback)
 
-    def _notify_change(self):
-        """Notifies all registered callbacks of a device change."""
-        devices = list(self._devices.values())
+    def _notify_change(self, devices: Optional[List[DiscoveredDevice]] = None):
+        """
+        Notifies all registered callbacks of a device change.
+
+        Pass a snapshot taken under the lock to notify without holding it.
+        """
+        if devices is None:
+            devices = list(self._devices.values())
         for callback in self._callbacks:
             try:
                 callback(devices)
@@ -0,0 +1,51 @@
+"""
+Compiled per-pixel kernels for frame processing (optional numba).
+
+Without numba (or if the kernels can't be created, e.g. in a frozen or
+read-only install), HAS_NUMBA is False and callers keep using their
+OpenCV/numpy paths. Importing this module never fails because of numba.
+"""
+
+import sys
+
+import numpy as np
+
+try:
+    from numba import config as numba_config, njit, prange
+    HAS_NUMBA = True
+except Exception:  # ImportError, or a numba build that doesn't match numpy
+    HAS_NUMBA = False
+
+if HAS_NUMBA:
+    # Kernels run on the video threads; with the TBB threading layer a
+    # parallel launch from a non-main thread can hang interpreter shutdown
+    numba_config.THREADING_LAYER_PRIORITY = ["omp", "workqueue", "tbb"]
+
+    def _nn_resize_py(src, dst):
+        h, w = src.shape[0], src.shape[1]
+        new_h, new_w = dst.shape[0], dst.shape[1]
+        for y in prange(new_h):
+            sy = y * h // new_h
+            for x in range(new_w):
+                sx = x * w // new_w
+                for c in range(dst.shape[2]):
+                    dst[y, x, c] = src[sy, sx, c]
+
+    try:
+        # Frozen builds have no source files to key the on-disk cache on
+        _nn_resize = njit(parallel=True, cache=not getattr(sys, "frozen", False))(_nn_resize_py)
+    except Exception as e:
+        # e.g. RuntimeError "no locator available" in a read-only install
+        print(f"numba kernels unavailable: {e}")
+        HAS_NUMBA = False
+
+
+def nn_resize(src: np.ndarray, dst: np.ndarray) -> None:
+    """
+    Nearest-neighbor resize of an (h, w, c) image into dst, whose shape sets
+    the output size. dst may be a view (e.g. a region of a letterbox canvas),
+    so no intermediate array is built.
+
+    Requires numba (check HAS_NUMBA first).
+    """
+    _nn_resize(src, dst)
@@ -2,11 +2,15 @@
 Punto de entrada principal de VanCamera Windows
 """
 import sys
+import logging
 import multiprocessing
 
 
 def main():
     """Función principal"""
+    # Mensajes de diagnóstico (usar level=logging.DEBUG para ver los de ADB)
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+
     # Import here to avoid issues with PyInstaller multiprocessing
     from ui_app import VanCameraApp
 
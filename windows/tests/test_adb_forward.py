@@ -0,0 +1,122 @@
+"""
+Tests for the adb server fallback logic in adb_forward.
+
+Run from the windows/ directory: python -m unittest discover tests
+"""
+
+import socket
+import subprocess
+import sys
+import unittest
+from pathlib import Path
+from unittest import mock
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+import adb_forward  # noqa: E402
+from adb_client import AdbDevice  # noqa: E402
+
+
+class FakeAdb:
+    """Stands in for both the adb server socket and the adb executable."""
+
+    def __init__(self):
+        self.running = True
+        self.start_works = True
+        self.slow = False
+        self.commands = []
+
+    def _check(self):
+        if not self.running:
+            raise ConnectionRefusedError("adb server not running")
+        if self.slow:
+            raise socket.timeout("timed out")
+
+    def devices(self, timeout_s=None):
+        self._check()
+        return [AdbDevice("ABC", "device")]
+
+    def shell(self, serial, command, timeout_s=None):
+        self._check()
+        return "Pixel 8\n"
+
+    def forward(self, local_port, remote_port, timeout_s=None):
+        self._check()
+
+    def run(self, args, timeout_s=5, text=True):
+        self.commands.append(args[1])
+        if args[1] == "start-server":
+            self.running = self.start_works
+        elif args[1] == "kill-server":
+            self.running = False
+        return subprocess.CompletedProcess(args, 1, stdout=b"", stderr=b"")
+
+
+class FakeAdbTestCase(unittest.TestCase):
+    def setUp(self):
+        self.adb = FakeAdb()
+        for target, value in (
+            ("_SERVER", self.adb),
+            ("_run_adb", self.adb.run),
+            ("adb_is_available", lambda: True),
+            ("_SERVER_START_ATTEMPTED", False),
+        ):
+            patcher = mock.patch.object(adb_forward, target, value)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+
+class ServerRestartTest(FakeAdbTestCase):
+    def test_server_restarted_after_kill(self):
+        self.assertEqual(len(adb_forward.list_connected_devices()), 1)
+
+        adb_forward.kill_adb_server()
+        self.assertEqual(len(adb_forward.list_connected_devices()), 1)
+        self.assertEqual(self.adb.commands, ["kill-server", "start-server"])
+
+    def test_server_restarted_after_kill_following_failed_start(self):
+        # A start that doesn't bring the server up disables further attempts...
+        self.adb.running = False
+        self.adb.start_works = False
+        self.assertEqual(adb_forward.list_connected_devices(), [])
+        self.assertEqual(adb_forward.list_connected_devices(), [])
+        self.assertEqual(self.adb.commands.count("start-server"), 1)
+        self.adb.start_works = True
+
+        # ...until the watchdog kills the server, after which it is started again
+        adb_forward.kill_adb_server()
+        self.assertEqual(len(adb_forward.list_connected_devices()), 1)
+        self.assertEqual(self.adb.commands[-1], "start-server")
+
+    def test_server_restarted_when_it_dies_after_a_successful_start(self):
+        self.adb.running = False
+        self.assertEqual(len(adb_forward.list_connected_devices()), 1)
+
+        self.adb.running = False  # Died on its own
+        self.assertEqual(len(adb_forward.list_connected_devices()), 1)
+        self.assertEqual(self.adb.commands, ["start-server", "start-server"])
+
+
+class SlowServerTest(FakeAdbTestCase):
+    """A server that accepts but doesn't answer is hung, not missing."""
+
+    def test_device_list_timeout_is_reported(self):
+        self.adb.slow = True
+        with self.assertRaises(subprocess.TimeoutExpired):
+            adb_forward.list_connected_devices()
+        # Neither restarted nor retried through the adb executable
+        self.assertEqual(self.adb.commands, [])
+
+    def test_device_name_gives_up_after_one_timeout(self):
+        self.adb.slow = True
+        self.assertEqual(adb_forward.get_device_name("ABC"), "ABC")
+        self.assertEqual(self.adb.commands, [])
+
+    def test_port_forward_gives_up_after_one_timeout(self):
+        self.adb.slow = True
+        self.assertFalse(adb_forward.ensure_port_forward(5000, 5000))
+        self.assertEqual(self.adb.commands, [])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,66 @@
+"""
+Tests for loading hand-edited configuration files.
+
+Run from the windows/ directory: python -m unittest discover tests
+"""
+
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+from unittest import mock
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+import config_manager  # noqa: E402
+from config_manager import AppConfig, ConfigManager  # noqa: E402
+
+
+class HandEditedConfigTest(unittest.TestCase):
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.config_file = Path(tmp.name) / "config.json"
+
+    def load(self, text: str) -> AppConfig:
+        self.config_file.write_text(text)
+        return ConfigManager(self.config_file).load()
+
+    def check_loaders(self, test):
+        # Both the msgspec path (when installed) and the json fallback
+        flags = (True, False) if config_manager.HAS_MSGSPEC else (False,)
+        for has_msgspec in flags:
+            with self.subTest(msgspec=has_msgspec), \
+                    mock.patch.object(config_manager, "HAS_MSGSPEC", has_msgspec):
+                test()
+
+    def test_float_field_keeps_the_other_settings(self):
+        def test():
+            config = self.load('{"fps": 30.0, "server_ip": "192.168.1.20"}')
+            self.assertEqual(config.fps, 30)
+            self.assertEqual(config.server_ip, "192.168.1.20")
+        self.check_loaders(test)
+
+    def test_string_field_keeps_the_other_settings(self):
+        def test():
+            config = self.load('{"server_port": "9000", "connection_mode": "usb"}')
+            self.assertEqual(int(config.server_port), 9000)
+            self.assertEqual(config.connection_mode, "usb")
+        self.check_loaders(test)
+
+    def test_non_integral_value_is_not_reset_to_defaults(self):
+        def test():
+            config = self.load('{"fps": 29.97, "video_width": 1920}')
+            self.assertEqual(config.fps, 29.97)
+            self.assertEqual(config.video_width, 1920)
+        self.check_loaders(test)
+
+    def test_unknown_fields_are_ignored(self):
+        def test():
+            config = self.load('{"legacy_option": true, "fps": 24}')
+            self.assertEqual(config.fps, 24)
+        self.check_loaders(test)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -2,10 +2,13 @@
 GUI with CustomTkinter
 """
 import customtkinter as ctk
+import logging
 import numpy as np
-from PIL import Image, ImageTk
 import threading
-from typing import Optional, List
+import time
+import tkinter as tk
+from collections import deque
+from typing import Dict, Optional, List, Tuple
 from video_receiver import VideoReceiver
 from virtual_cam_bridge import VirtualCamBridge
 from certificate_handler import CertificateHandler
@@ -13,10 +16,83 @@ from config_manager import ConfigManager, AppConfig
 from adb_forward import ensure_port_forward
 from device_discovery import DeviceDiscovery, DiscoveredDevice
 
+# OpenCV writes rotations/flips straight into a preallocated buffer (numpy fallback)
+try:
+    import cv2
+    HAS_CV2 = True
+except ImportError:
+    HAS_CV2 = False
+
+# Frame transforms as (k, mirror): k counter-clockwise quarter turns (as in
+# np.rot90) followed by an optional horizontal flip, keyed by
+# (orientation_degrees, is_back_camera).
+_PREVIEW_TRANSFORMS: Dict[Tuple[int, bool], Tuple[int, bool]] = {
+    # Back camera (don't touch - working)
+    (0, True): (0, False),
+    (90, True): (3, False),
+    (180, True): (2, False),
+    (270, True): (1, False),
+    # Front camera - rotate then flip horizontal
+    (0, False): (0, True),
+    (90, False): (1, True),
+    (180, False): (2, True),
+    (270, False): (3, True),
+}
+_VCAM_TRANSFORMS: Dict[Tuple[int, bool], Tuple[int, bool]] = {
+    # Back camera for OBS/Virtual Camera: landscape (0° and 180°) just flips,
+    # portrait rotates then flips
+    (0, True): (0, True),
+    (90, True): (3, True),
+    (180, True): (0, True),
+    (270, True): (1, True),
+    # Front camera - standard rotation
+    (0, False): (0, False),
+    (90, False): (1, False),
+    (180, False): (2, False),
+    (270, False): (3, False),
+}
+_NO_TRANSFORM = (0, False)
+
+logger = logging.getLogger(__name__)
+
+if HAS_CV2:
+    _CV2_ROTATIONS = {
+        1: cv2.ROTATE_90_COUNTERCLOCKWISE,
+        2: cv2.ROTATE_180,
+        3: cv2.ROTATE_90_CLOCKWISE,
+    }
+
+
+def _area_resize(src: np.ndarray, size: Tuple[int, int],
+                 dst: Optional[np.ndarray] = None) -> np.ndarray:
+    """
+    cv2.resize with INTER_AREA. OpenCV has a fast path for integer reduction
+    ratios; other reductions of 2x or more (e.g. portrait frames fitted to the
+    preview height) are cheaper as a SIMD pyrDown followed by the area resize.
+    """
+    h, w = src.shape[:2]
+    new_w, new_h = size
+    if (w % new_w or h % new_h) and w >= 2 * new_w and h >= 2 * new_h:
+        src = cv2.pyrDown(src)
+    return cv2.resize(src, size, dst=dst, interpolation=cv2.INTER_AREA)
+
+
+def _nv12_planes(frame: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """Splits a (h*3/2, w) NV12 frame into its Y (h, w) and UV (h/2, w/2, 2) views."""
+    h = frame.shape[0] * 2 // 3
+    w = frame.shape[1]
+    return frame[:h], frame[h:].reshape(h // 2, w // 2, 2)
+
 
 class VanCameraApp:
     """VanCamera Windows main application"""
 
+    # Preview area; frames are scaled down to fit (aspect ratio preserved)
+    PREVIEW_WIDTH = 640
+    PREVIEW_HEIGHT = 360
+    # The preview is painted at most this often, whatever the stream's frame rate
+    PREVIEW_MAX_FPS = 30
+
     def __init__(self):
         ctk.set_appearance_mode("dark")
         ctk.set_default_color_theme("blue")
@@ -28,32 +104,86 @@ class VanCameraApp:
         self.config_manager = ConfigManager()
         self.config = self.config_manager.load()
 
+        # The certificate is loaded on a worker thread (see _startup_tasks) so
+        # file I/O and SSL setup don't delay the window; connecting waits for it
         self.cert_handler = CertificateHandler()
-        if self.config.certificate_path:
-            from pathlib import Path
-            self.cert_handler.load_certificate(Path(self.config.certificate_path))
+        self._startup_done = threading.Event()
 
         self.video_receiver: Optional[VideoReceiver] = None
         self.virtual_cam: Optional[VirtualCamBridge] = None
 
         self.is_streaming = False
         self.current_frame: Optional[np.ndarray] = None
-        # Keep reference to prevent garbage collection of PhotoImage
-        self._current_photo: Optional[ImageTk.PhotoImage] = None
+        # Keep reference to prevent garbage collection of PhotoImage.
+        # It is reused across frames while the preview size is unchanged.
+        self._current_photo: Optional[tk.PhotoImage] = None
+        # Its configure method and size, cached so each frame costs one Tk call
+        self._photo_configure = None
+        self._photo_size: Optional[Tuple[int, int]] = None
+        # Preview pixels live in a persistent binary PPM (header + RGB) that Tk
+        # decodes directly; _preview_buf is a numpy view over its pixel data.
+        self._preview_ppm: Optional[bytearray] = None
+        self._preview_buf: Optional[np.ndarray] = None
+        # Immutable copy of the PPM for Tk (tkinter only passes bytes through
+        # as binary data), taken on the preview worker, off the UI thread
+        self._preview_data: Optional[bytes] = None
+        # Only the first error loading a frame into Tk is printed
+        self._preview_error_logged = False
 
         # Frame dropping for low latency - track if UI update is pending
         self._ui_update_pending = False
+        self._last_preview_ts = 0.0
+        self._min_preview_interval = 1.0 / self.PREVIEW_MAX_FPS
+
+        # Preview processing runs on its own thread, fed through a single-slot
+        # deque that always holds the newest frame (older ones are dropped).
+        # Frames go back to the receiver (release_frame) once both paths are done.
+        self._frame_slot: Optional[deque] = None
+        self._frame_ready = threading.Event()
+
+        # Reused output buffers for rotated/flipped frames, one per target and
+        # orientation (landscape/portrait) so turning the phone doesn't reallocate
+        self._transform_bufs: Dict[Tuple[str, bool], np.ndarray] = {}
+
+        # Decoder output format: with OpenCV the virtual camera gets NV12 as
+        # decoded and only the preview is converted to RGB (at preview size)
+        self._frame_format = "nv12" if HAS_CV2 else "rgb24"
+        self._preview_nv12: Optional[np.ndarray] = None
 
         # Device discovery
         self.device_discovery = DeviceDiscovery()
         self.device_discovery.on_devices_changed(self._on_devices_changed)
         self._selected_device: Optional[DiscoveredDevice] = None
+        # Latest device list not yet shown; bursts of discovery events collapse
+        # into a single dropdown/status refresh on the UI thread
+        self._pending_devices: Optional[List[DiscoveredDevice]] = None
+        self._pending_devices_lock = threading.Lock()
 
         self.setup_ui()
 
         # Start device discovery after UI is set up
         self.device_discovery.start()
 
+        threading.Thread(target=self._startup_tasks, daemon=True).start()
+
+    def _startup_tasks(self):
+        """Slow startup I/O, run off the UI thread while the window comes up."""
+        try:
+            if self.config.certificate_path:
+                from pathlib import Path
+                if not self.cert_handler.load_certificate(Path(self.config.certificate_path)):
+                    self.root.after(0, lambda: self.status_label.configure(
+                        text="Error: could not load certificate", text_color="red"
+                    ))
+            # Build (and cache) the SSL context the first connection will use
+            self.cert_handler.create_ssl_context(
+                verify_cert=self.cert_handler.cert_path is not None
+            )
+        except Exception as e:
+            print(f"Error in startup tasks: {e}")
+        finally:
+            self._startup_done.set()
+
     def setup_ui(self):
         """Sets up the user interface"""
         # Main frame
@@ -64,8 +194,8 @@ class VanCameraApp:
         self.preview_label = ctk.CTkLabel(
             main_frame,
             text="No connection",
-            width=640,
-            height=360
+            width=self.PREVIEW_WIDTH,
+            height=self.PREVIEW_HEIGHT
         )
         self.preview_label.pack(pady=10)
 
@@ -115,10 +245,45 @@ class VanCameraApp:
         )
         self.status_label.pack(pady=5)
 
+        # Bound once, used for every preview frame. _apply_preview is registered
+        # as a Tcl command up front: root.after_idle() would wrap and register
+        # (then delete) a new command for each frame.
+        self._preview_configure = self.preview_label.configure
+        self._apply_preview_cmd = self.root.register(self._apply_preview)
+        self._tk_call = self.root.tk.call
+
+        # Skip all preview work while the window is minimized or fully covered
+        self._preview_visible = True
+        self.root.bind("<Map>", self._on_window_visibility, add="+")
+        self.root.bind("<Unmap>", self._on_window_visibility, add="+")
+        self.root.bind("<Visibility>", self._on_window_visibility, add="+")
+
+    def _on_window_visibility(self, event):
+        """Tracks whether the main window (and so the preview) can be seen."""
+        if event.widget is not self.root:
+            return  # Toplevel bindings also fire for every child widget
+        if event.type == tk.EventType.Unmap:
+            self._preview_visible = False
+        elif event.type == tk.EventType.Map:
+            self._preview_visible = True
+        else:
+            self._preview_visible = event.state != "VisibilityFullyObscured"
+
     def _on_devices_changed(self, devices: List[DiscoveredDevice]):
         """Called when the list of discovered devices changes."""
-        # Update dropdown on the main thread
-        self.root.after(0, lambda: self._update_device_dropdown(devices))
+        # Update dropdown on the main thread, once per idle pass
+        with self._pending_devices_lock:
+            schedule = self._pending_devices is None
+            self._pending_devices = devices
+        if schedule:
+            self.root.after_idle(self._apply_pending_devices)
+
+    def _apply_pending_devices(self):
+        """Shows the most recent device list posted by _on_devices_changed."""
+        with self._pending_devices_lock:
+            devices, self._pending_devices = self._pending_devices, None
+        if devices is not None:
+            self._update_device_dropdown(devices)
 
     def _update_device_dropdown(self, devices: List[DiscoveredDevice]):
         """Updates the device dropdown with discovered devices."""
@@ -174,23 +339,26 @@ class VanCameraApp:
                 )
                 return
 
+            # The certificate decides how the TLS connection is verified
+            self._startup_done.wait(timeout=5)
+
             device = self._selected_device
             ip = device.address
             port = device.port
 
-            print(f"Connecting to {device.name} ({device.type}) at {ip}:{port}")
+            logger.info("Connecting to %s (%s) at %s:%s", device.name, device.type, ip, port)
 
             # For USB devices, ensure ADB port forwarding is set up
             if device.type == "usb":
                 # Extract serial from device ID (format: "usb:SERIAL")
                 serial = device.id.replace("usb:", "")
-                print(f"ADB: Setting up port forward tcp:{port} -> tcp:{port} for {serial}...")
+                logger.debug("ADB: Setting up port forward tcp:%s -> tcp:%s for %s...", port, port, serial)
 
                 if ensure_port_forward(local_port=port, remote_port=port):
-                    print("ADB: Port forward established successfully")
+                    logger.debug("ADB: Port forward established successfully")
                     self.config.connection_mode = "usb"
                 else:
-                    print("ADB: Port forward FAILED")
+                    logger.warning("ADB: Port forward FAILED")
                     self.status_label.configure(
                         text="Error: could not setup ADB port forward",
                         text_color="red",
@@ -199,7 +367,7 @@ class VanCameraApp:
             else:
                 # WiFi connection
                 self.config.connection_mode = "wifi"
-                print(f"WiFi: Direct connection to {ip}:{port}")
+                logger.debug("WiFi: Direct connection to %s:%s", ip, port)
 
             # Update configuration
             self.config.server_ip = ip
@@ -208,13 +376,14 @@ class VanCameraApp:
 
             # Initialize receiver
             self.video_receiver = VideoReceiver(ip, port, self.cert_handler)
-            self.video_receiver.set_frame_callback(self.on_frame_received)
+            self.video_receiver.set_frame_callback(self.on_frame_received, self._frame_format)
 
             # Initialize virtual camera
             self.virtual_cam = VirtualCamBridge(
                 width=self.config.video_width,
                 height=self.config.video_height,
-                fps=self.config.fps
+                fps=self.config.fps,
+                pixel_format=self._frame_format,
             )
 
             if not self.virtual_cam.start():
@@ -227,8 +396,9 @@ class VanCameraApp:
 
             # Connect and start receiving
             if self.video_receiver.connect():
-                self.video_receiver.start_receiving()
                 self.is_streaming = True
+                self._start_preview_worker()
+                self.video_receiver.start_receiving()
                 self.start_button.configure(text="Stop Receiving")
                 self.status_label.configure(
                     text=f"Connected to {device.name}",
@@ -245,9 +415,16 @@ class VanCameraApp:
         """Stops video reception"""
         # Set flag FIRST to stop callbacks from updating UI
         self.is_streaming = False
+        self._stop_preview_worker()
 
         # Clear photo reference
         self._current_photo = None
+        self._photo_configure = None
+        self._photo_size = None
+        self._preview_ppm = None
+        self._preview_buf = None
+        self._preview_data = None
+        self._preview_nv12 = None
 
         if self.video_receiver:
             self.video_receiver.disconnect()
@@ -257,6 +434,8 @@ class VanCameraApp:
             self.virtual_cam.stop()
             self.virtual_cam = None
 
+        self._transform_bufs.clear()
+
         self.start_button.configure(text="Start Receiving")
         self.status_label.configure(text="Disconnected", text_color="red")
 
@@ -271,119 +450,297 @@ class VanCameraApp:
         Callback when a frame is received.
 
         Args:
-            frame: Decoded video frame (RGB numpy array)
+            frame: Decoded video frame (RGB, or NV12 when _frame_format is "nv12")
             orientation_degrees: Device orientation (0, 90, 180, 270)
             is_back_camera: True if this is from the back camera (different rotation needed)
         """
-        # Process frame for preview
-        preview_frame = self._process_frame_for_preview(frame, orientation_degrees, is_back_camera)
-        self.current_frame = preview_frame
+        key = (orientation_degrees, is_back_camera)
 
-        # Process frame for virtual camera (OBS) - may need different transformations
+        # Process frame for virtual camera (OBS) - full resolution
         if self.virtual_cam:
-            vcam_frame = self._process_frame_for_vcam(frame, orientation_degrees, is_back_camera)
+            vcam_transform = _VCAM_TRANSFORMS.get(key, _NO_TRANSFORM)
+            if self._frame_format == "nv12":
+                vcam_frame = self._transform_nv12(frame, vcam_transform, "vcam")
+            else:
+                vcam_frame = self._transform_frame(frame, vcam_transform, "vcam")
             self.virtual_cam.send_frame(vcam_frame)
 
-        # Update UI preview
-        self.update_preview(preview_frame)
-
-    def _process_frame_for_preview(self, frame: np.ndarray, orientation_degrees: int, is_back_camera: bool) -> np.ndarray:
-        """Process frame for UI preview display."""
-        if is_back_camera:
-            # Back camera transformations for PREVIEW (don't touch - working)
-            if orientation_degrees == 0:
-                return frame
-            elif orientation_degrees == 90:
-                return np.rot90(frame, k=3)
-            elif orientation_degrees == 180:
-                return np.rot90(frame, k=2)
-            elif orientation_degrees == 270:
-                return np.rot90(frame, k=1)
-            else:
-                return frame
-        else:
-            # Front camera for PREVIEW - rotate then flip horizontal
-            rotated = self._rotate_front_camera(frame, orientation_degrees)
-            return np.fliplr(rotated)
-
-    def _process_frame_for_vcam(self, frame: np.ndarray, orientation_degrees: int, is_back_camera: bool) -> np.ndarray:
-        """Process frame for virtual camera (OBS)."""
-        if is_back_camera:
-            # Back camera transformations for OBS/Virtual Camera
-            # Both landscape orientations (0° and 180°) need same treatment
-            if orientation_degrees == 0:
-                # Landscape right - just flip horizontal
-                return np.fliplr(frame)
-            elif orientation_degrees == 90:
-                # Portrait - rotate 270° + flip horizontal (OK)
-                rotated = np.rot90(frame, k=3)
-                return np.fliplr(rotated)
-            elif orientation_degrees == 180:
-                # Landscape left - just flip horizontal
-                return np.fliplr(frame)
-            elif orientation_degrees == 270:
-                # Portrait upside-down - rotate 90° + flip horizontal
-                rotated = np.rot90(frame, k=1)
-                return np.fliplr(rotated)
-            else:
-                return frame
-        else:
-            # Front camera - standard rotation
-            return self._rotate_front_camera(frame, orientation_degrees)
+        # Hand the frame to the preview worker so the receiver thread can go
+        # straight back to reading the socket
+        slot = self._frame_slot
+        if slot is None or not self._preview_visible:
+            self._release_frame(frame)
+            return
+
+        # Only this thread appends, so whatever popleft() finds was never
+        # picked up by the worker and can go back to the receiver
+        try:
+            dropped = slot.popleft()
+        except IndexError:
+            dropped = None
+        slot.append((frame, _PREVIEW_TRANSFORMS.get(key, _NO_TRANSFORM)))
+        self._frame_ready.set()
+        if dropped is not None:
+            self._release_frame(dropped[0])
+
+    def _release_frame(self, frame: np.ndarray):
+        """Returns a decoded frame's buffer to the receiver for reuse."""
+        receiver = self.video_receiver
+        if receiver is not None:
+            receiver.release_frame(frame)
+
+    def _start_preview_worker(self):
+        """Starts the thread that downscales/rotates frames for the preview."""
+        self._frame_slot = deque(maxlen=1)
+        self._frame_ready = threading.Event()
+        threading.Thread(
+            target=self._preview_loop, args=(self._frame_slot, self._frame_ready), daemon=True
+        ).start()
+
+    def _stop_preview_worker(self):
+        """Signals the preview thread to exit."""
+        slot, self._frame_slot = self._frame_slot, None
+        if slot is not None:
+            slot.clear()
+            self._frame_ready.set()
+
+    def _preview_loop(self, slot: deque, ready: threading.Event):
+        """Preview worker: processes the newest frame and hands it to the UI thread."""
+        # Runs until stop_streaming (or a restart) replaces the active slot
+        while self._frame_slot is slot:
+            ready.wait(timeout=0.5)
+            ready.clear()
+            try:
+                frame, transform = slot.popleft()
+            except IndexError:
+                continue
+            # Downscaled first, then rotated
+            self.update_preview(frame, transform)
+            self._release_frame(frame)
+
+    def _transform_frame(self, frame: np.ndarray, transform: Tuple[int, bool], target: str) -> np.ndarray:
+        """
+        Rotates (k quarter turns counter-clockwise) and optionally mirrors a frame.
 
-    def _rotate_front_camera(self, frame: np.ndarray, orientation_degrees: int) -> np.ndarray:
-        """Standard rotation for front camera."""
-        if orientation_degrees == 0:
+        With OpenCV the result is written in one or two passes into a buffer
+        reused across frames for the given target and output orientation,
+        instead of chaining np.rot90/np.fliplr views that get copied again
+        downstream.
+        """
+        k, mirror = transform
+        if k == 0 and not mirror:
             return frame
-        elif orientation_degrees == 90:
-            return np.rot90(frame, k=1)
-        elif orientation_degrees == 180:
-            return np.rot90(frame, k=2)
-        elif orientation_degrees == 270:
-            return np.rot90(frame, k=3)
-        else:
+
+        if not HAS_CV2:
+            rotated = np.rot90(frame, k=k) if k else frame
+            return np.fliplr(rotated) if mirror else rotated
+
+        h, w = frame.shape[:2]
+        swapped = bool(k % 2)
+        out_shape = (w, h) + frame.shape[2:] if swapped else frame.shape
+        buf = self._transform_buffer(target, swapped, out_shape)
+        self._transform_into(frame, transform, buf)
+        return buf
+
+    def _transform_nv12(self, frame: np.ndarray, transform: Tuple[int, bool], target: str) -> np.ndarray:
+        """
+        Same as _transform_frame for an NV12 frame: the Y and interleaved UV
+        planes are transformed separately, straight into one reused NV12 buffer.
+        """
+        k, mirror = transform
+        if k == 0 and not mirror:
             return frame
 
-    def update_preview(self, frame: np.ndarray):
-        """Actualiza el preview en la UI con frame dropping para baja latencia"""
+        h = frame.shape[0] * 2 // 3
+        w = frame.shape[1]
+        swapped = bool(k % 2)
+        out_h, out_w = (w, h) if swapped else (h, w)
+        buf = self._transform_buffer(target, swapped, (out_h * 3 // 2, out_w))
+
+        src_y, src_uv = _nv12_planes(frame)
+        dst_y, dst_uv = _nv12_planes(buf)
+        self._transform_into(src_y, transform, dst_y)
+        self._transform_into(src_uv, transform, dst_uv)
+        return buf
+
+    def _transform_buffer(self, target: str, swapped: bool, shape: Tuple[int, ...]) -> np.ndarray:
+        """Returns the reused output buffer for target/orientation, (re)allocated for shape."""
+        buf = self._transform_bufs.get((target, swapped))
+        if buf is None or buf.shape != shape:
+            buf = np.empty(shape, dtype=np.uint8)
+            self._transform_bufs[(target, swapped)] = buf
+        return buf
+
+    @staticmethod
+    def _transform_into(frame: np.ndarray, transform: Tuple[int, bool], dst: np.ndarray):
+        """Writes the rotated/mirrored frame into dst (already shaped for the result)."""
+        k, mirror = transform
+        if not HAS_CV2:
+            rotated = np.rot90(frame, k=k) if k else frame
+            np.copyto(dst, np.fliplr(rotated) if mirror else rotated)
+        elif not mirror:
+            cv2.rotate(frame, _CV2_ROTATIONS[k], dst=dst)
+        elif k == 0:
+            cv2.flip(frame, 1, dst=dst)
+        elif k == 2:
+            cv2.flip(frame, 0, dst=dst)     # 180° + mirror = vertical flip
+        else:
+            cv2.transpose(frame, dst=dst)   # 270° + mirror = transpose
+            if k == 1:
+                cv2.flip(dst, -1, dst=dst)  # 90° + mirror = transpose + 180°
+
+    def _preview_size(self, h: int, w: int, k: int) -> Tuple[int, int]:
+        """
+        Returns the (width, height) a h x w frame is scaled to so that, once
+        rotated by k quarter turns, it fits the preview area. Never upscales.
+        """
+        out_w, out_h = (h, w) if k % 2 else (w, h)
+        scale = min(self.PREVIEW_WIDTH / out_w, self.PREVIEW_HEIGHT / out_h)
+        if scale >= 1:
+            return w, h
+        return max(1, round(w * scale)), max(1, round(h * scale))
+
+    def _resize_for_preview(self, frame: np.ndarray, k: int) -> np.ndarray:
+        """
+        Downscales a frame so that, once rotated by k quarter turns, it fits the
+        preview area. Rotating the small image instead of the full-resolution
+        frame cuts the preview's pixel work by roughly the downscale factor.
+        """
+        h, w = frame.shape[:2]
+        new_w, new_h = self._preview_size(h, w, k)
+        if (new_w, new_h) == (w, h):
+            return frame  # Never upscale the preview
+
+        if HAS_CV2:
+            return _area_resize(frame, (new_w, new_h))
+
+        # Fallback for integer ratios (e.g. 1080p -> 360p): vectorized block average
+        ry, rx = h // new_h, w // new_w
+        if ry * new_h == h and rx * new_w == w:
+            blocks = frame.reshape(new_h, ry, new_w, rx, -1)
+            total = blocks.sum(axis=(1, 3), dtype=np.uint32)
+            n = ry * rx
+            return ((total + n // 2) // n).astype(np.uint8)
+
+        # Otherwise nearest neighbor via index arrays
+        y_indices = np.arange(new_h) * h // new_h
+        x_indices = np.arange(new_w) * w // new_w
+        return frame[y_indices[:, None], x_indices]
+
+    def _nv12_preview_rgb(self, frame: np.ndarray, k: int) -> np.ndarray:
+        """
+        Scales an NV12 frame down to preview size (both planes, INTER_AREA) and
+        only then converts it to RGB, so the color conversion runs on preview
+        pixels instead of the full frame.
+        """
+        src_y, src_uv = _nv12_planes(frame)
+        h, w = src_y.shape
+        new_w, new_h = self._preview_size(h, w, k)
+        new_w, new_h = max(2, new_w & ~1), max(2, new_h & ~1)  # Even for 2x2 chroma
+
+        if (new_w, new_h) == (w, h):
+            return cv2.cvtColor(frame, cv2.COLOR_YUV2RGB_NV12)
+
+        if self._preview_nv12 is None or self._preview_nv12.shape != (new_h * 3 // 2, new_w):
+            self._preview_nv12 = np.empty((new_h * 3 // 2, new_w), dtype=np.uint8)
+        dst_y, dst_uv = _nv12_planes(self._preview_nv12)
+        _area_resize(src_y, (new_w, new_h), dst_y)
+        _area_resize(src_uv, (new_w // 2, new_h // 2), dst_uv)
+        return cv2.cvtColor(self._preview_nv12, cv2.COLOR_YUV2RGB_NV12)
+
+    def _ensure_preview_buffer(self, h: int, w: int) -> np.ndarray:
+        """Returns the RGB pixel view of the persistent PPM, (re)allocated for h x w."""
+        if self._preview_buf is None or self._preview_buf.shape[:2] != (h, w):
+            header = b"P6\n%d %d\n255\n" % (w, h)
+            self._preview_ppm = bytearray(len(header) + h * w * 3)
+            self._preview_ppm[:len(header)] = header
+            self._preview_buf = np.frombuffer(
+                self._preview_ppm, dtype=np.uint8, offset=len(header)
+            ).reshape(h, w, 3)
+        return self._preview_buf
+
+    def _fill_preview_buffer(self, frame: np.ndarray):
+        """Writes an RGB preview frame into the persistent PPM."""
+        buf = self._ensure_preview_buffer(*frame.shape[:2])
+        np.copyto(buf, frame)
+
+    def update_preview(self, frame: np.ndarray, transform: Tuple[int, bool] = _NO_TRANSFORM):
+        """
+        Actualiza el preview en la UI con frame dropping para baja latencia
+
+        Args:
+            frame: Full-resolution decoded frame
+            transform: (k, mirror) rotation to apply after downscaling
+        """
         # Don't update if not streaming (prevents errors after stopping)
         if not self.is_streaming:
             return
 
+        # Nothing to show while minimized/hidden; the vcam path is unaffected
+        if not self._preview_visible:
+            return
+
+        # Wall-clock gate: skip frames arriving faster than PREVIEW_MAX_FPS
+        now = time.perf_counter()
+        if now - self._last_preview_ts < self._min_preview_interval:
+            return
+
         # Frame dropping: skip this frame if UI hasn't finished updating the previous one
         if self._ui_update_pending:
             return  # Drop frame - UI is behind
 
         try:
-            # Convertir a PIL Image
-            img = Image.fromarray(frame)
+            if self._frame_format == "nv12":
+                # Reducir en YUV, convertir a RGB a tamaño de preview y rotar
+                small = self._nv12_preview_rgb(frame, transform[0])
+                preview_frame = self._transform_frame(small, transform, "preview")
+                self.current_frame = preview_frame
+                self._fill_preview_buffer(preview_frame)
+            else:
+                # Redimensionar y rotar para preview
+                small = self._resize_for_preview(frame, transform[0])
+                preview_frame = self._transform_frame(small, transform, "preview")
+                self.current_frame = preview_frame
 
-            # Redimensionar para preview - use NEAREST for speed (fastest resampling)
-            img.thumbnail((640, 360), Image.Resampling.NEAREST)
+                # Copiar al PPM persistente (Tk lo decodifica sin pasar por PIL)
+                self._fill_preview_buffer(preview_frame)
 
-            # Convertir a PhotoImage and store reference to prevent garbage collection
-            self._current_photo = ImageTk.PhotoImage(image=img)
+            # The one copy per frame: Tk needs bytes, not the reused bytearray
+            self._preview_data = bytes(self._preview_ppm)
 
-            # Mark update as pending
+            # Mark update as pending (the buffer isn't touched until it clears)
             self._ui_update_pending = True
+            self._last_preview_ts = now
 
-            # Actualizar label (debe hacerse en el hilo principal)
-            # Use a direct reference to the stored photo
-            def _update_label():
-                if self.is_streaming and self._current_photo:
-                    try:
-                        self.preview_label.configure(image=self._current_photo, text="")
-                    except Exception:
-                        pass  # Ignore errors if widget was destroyed
-                # Mark update complete so next frame can be processed
-                self._ui_update_pending = False
-
-            self.root.after(0, _update_label)
+            # Actualizar label en el hilo principal, en la próxima pasada idle
+            self._tk_call("after", "idle", self._apply_preview_cmd)
 
         except Exception as e:
             self._ui_update_pending = False  # Reset on error
             print(f"Error updating preview: {e}")
 
+    def _apply_preview(self):
+        """UI thread: loads the prepared PPM into the preview PhotoImage."""
+        if self.is_streaming and self._preview_data is not None:
+            try:
+                h, w = self._preview_buf.shape[:2]
+                if self._photo_size != (w, h):
+                    # First frame or orientation change: new PhotoImage
+                    photo = tk.PhotoImage(master=self.root, width=w, height=h)
+                    self._current_photo = photo
+                    self._photo_configure = photo.configure
+                    self._photo_size = (w, h)
+                    self._preview_configure(image=photo, text="")
+                # bytes, not the bytearray: tkinter would pass its str() repr
+                self._photo_configure(data=self._preview_data, format="PPM")
+            except Exception as e:
+                # Also raised once the widget is destroyed; report the first one
+                if not self._preview_error_logged:
+                    self._preview_error_logged = True
+                    print(f"Error displaying preview: {e}")
+        # Mark update complete so next frame can be processed
+        self._ui_update_pending = False
+
     def run(self):
         """Runs the application"""
         self.root.mainloop()
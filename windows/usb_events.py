@@ -0,0 +1,139 @@
+"""
+USB device-change notifications on Windows.
+
+Windows broadcasts WM_DEVICECHANGE when a device interface appears or goes
+away. Registering for the ADB interface class lets DeviceDiscovery re-enumerate
+as soon as a phone is plugged in instead of polling adb on a timer.
+
+Requires pywin32; on other platforms (or without pywin32) start() returns False
+and callers keep polling.
+"""
+
+from __future__ import annotations
+
+import sys
+import threading
+from typing import Callable, Optional
+
+try:
+    import win32api
+    import win32con
+    import win32gui
+    import win32gui_struct
+    HAS_PYWIN32 = True
+except ImportError:
+    HAS_PYWIN32 = False
+
+# Device interface class registered by the Android USB (ADB) driver
+ADB_INTERFACE_GUID = "{F72FE0D4-CBCB-407d-8814-9ED673D0DD6B}"
+
+# Parent handle for message-only windows (not exported by win32con)
+HWND_MESSAGE = -3
+
+
+class UsbEventListener:
+    """Calls on_change whenever an ADB USB interface arrives or is removed."""
+
+    WINDOW_CLASS_NAME = "VanCameraUsbEvents"
+
+    def __init__(self, on_change: Callable[[], None]):
+        self._on_change = on_change
+        self._thread: Optional[threading.Thread] = None
+        self._hwnd = None
+        self._ready = threading.Event()
+        self._started = False
+
+    def start(self) -> bool:
+        """
+        Starts listening on a background thread.
+
+        Returns:
+            True if notifications are active, False if unsupported here
+        """
+        if sys.platform != "win32" or not HAS_PYWIN32:
+            return False
+        if self._thread and self._thread.is_alive():
+            return self._started
+
+        self._ready.clear()
+        self._started = False
+        self._thread = threading.Thread(target=self._message_loop, daemon=True)
+        self._thread.start()
+        self._ready.wait(timeout=2)
+        return self._started
+
+    def stop(self):
+        """Stops listening and tears down the hidden window."""
+        if self._hwnd:
+            try:
+                win32gui.PostMessage(self._hwnd, win32con.WM_CLOSE, 0, 0)
+            except Exception:
+                pass
+        if self._thread and self._thread.is_alive():
+            self._thread.join(timeout=2)
+        self._thread = None
+        self._hwnd = None
+
+    def _message_loop(self):
+        """Creates a message-only window and pumps its messages until WM_CLOSE."""
+        hinst = win32api.GetModuleHandle(None)
+        class_atom = None
+        notify_handle = None
+
+        try:
+            wc = win32gui.WNDCLASS()
+            wc.hInstance = hinst
+            wc.lpszClassName = self.WINDOW_CLASS_NAME
+            wc.lpfnWndProc = {
+                win32con.WM_DEVICECHANGE: self._on_device_change,
+                win32con.WM_CLOSE: self._on_close,
+                win32con.WM_DESTROY: self._on_destroy,
+            }
+            class_atom = win32gui.RegisterClass(wc)
+            self._hwnd = win32gui.CreateWindowEx(
+                0, class_atom, "VanCamera USB events", 0,
+                0, 0, 0, 0, HWND_MESSAGE, 0, hinst, None
+            )
+
+            notify_filter = win32gui_struct.PackDEV_BROADCAST_DEVICEINTERFACE(ADB_INTERFACE_GUID)
+            notify_handle = win32gui.RegisterDeviceNotification(
+                self._hwnd, notify_filter, win32con.DEVICE_NOTIFY_WINDOW_HANDLE
+            )
+        except Exception as e:
+            print(f"USB notifications unavailable: {e}")
+            if self._hwnd:
+                win32gui.DestroyWindow(self._hwnd)
+                self._hwnd = None
+            if class_atom:
+                win32gui.UnregisterClass(class_atom, hinst)
+            self._ready.set()
+            return
+
+        self._started = True
+        self._ready.set()
+
+        try:
+            win32gui.PumpMessages()
+        finally:
+            try:
+                win32gui.UnregisterDeviceNotification(notify_handle)
+                win32gui.UnregisterClass(class_atom, hinst)
+            except Exception:
+                pass
+            self._started = False
+
+    def _on_device_change(self, hwnd, msg, wparam, lparam):
+        if wparam in (win32con.DBT_DEVICEARRIVAL, win32con.DBT_DEVICEREMOVECOMPLETE):
+            try:
+                self._on_change()
+            except Exception as e:
+                print(f"Error in USB change callback: {e}")
+        return True
+
+    def _on_close(self, hwnd, msg, wparam, lparam):
+        win32gui.DestroyWindow(hwnd)
+        return 0
+
+    def _on_destroy(self, hwnd, msg, wparam, lparam):
+        win32gui.PostQuitMessage(0)
+        return 0
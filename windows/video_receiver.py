@@ -1,16 +1,20 @@
 """
 Receptor de video H.264 desde Android vía TLS 1.3
 """
+import os
+import queue
 import socket
 import ssl
-import struct
 import threading
-from typing import Optional, Callable
+from collections import deque
+from typing import Optional, Callable, Union
 import numpy as np
 from certificate_handler import CertificateHandler
+from yuv_convert import HAS_LIBYUV, i420_to_nv12, i420_to_rgb, nv12_to_rgb
 
 try:
     import av
+    from av.video.reformatter import VideoReformatter
     HAS_AV = True
     # PyAV 16+ exposes specific error types like InvalidDataError and FFmpegError,
     # but does NOT have av.AVError. Import the concrete error classes instead.
@@ -24,6 +28,54 @@ except ImportError:
     print("Advertencia: PyAV no está instalado. La decodificación H.264 puede no funcionar correctamente.")
     InvalidDataError = FFmpegError = Exception  # type: ignore
 
+# Decodificación por hardware (PyAV 14+); sin esto se decodifica por software
+try:
+    from av.codec.hwaccel import HWAccel, hwdevices_available
+    HAS_HWACCEL = True
+except ImportError:
+    HAS_HWACCEL = False
+
+# Kernel receive buffer for the video socket (fits several 1080p keyframes)
+RECV_BUFFER_SIZE = 4 * 1024 * 1024
+
+# Packets buffered between the receive and decode threads. H.264 packets can't
+# be dropped individually (every P-frame references the previous one), so a
+# full queue blocks the receiver instead and TCP flow control takes over.
+PACKET_QUEUE_SIZE = 8
+
+# Packets waiting for the decoder (~130 ms at 30 fps) before the receiver
+# starts dropping frames up to the next keyframe to catch up
+SKIP_BACKLOG = 4
+
+# H.264 NAL unit types (Annex B, as sent by the Android encoder)
+_NAL_SLICE = 1      # Non-IDR slice (P/B frame)
+_NAL_IDR = 5        # Keyframe slice
+_NAL_SPS = 7        # Sent right before every keyframe
+
+
+def _is_keyframe(data: bytearray) -> bool:
+    """True if the access unit can be decoded on its own (IDR)."""
+    pos = data.find(b'\x00\x00\x01')
+    while 0 <= pos < len(data) - 3:
+        nal_type = data[pos + 3] & 0x1F
+        if nal_type in (_NAL_IDR, _NAL_SPS):
+            return True
+        if nal_type == _NAL_SLICE:
+            return False
+        pos = data.find(b'\x00\x00\x01', pos + 3)
+    return False
+
+# Hardware decoders to try, in order (the first one FFmpeg was built with wins)
+HW_DEVICE_TYPES = ('d3d11va', 'dxva2', 'cuda', 'qsv')
+
+# Formats hardware frames are downloaded as; software H.264 gives yuv420p/yuvj420p
+HW_DOWNLOAD_FORMATS = ('nv12', 'p010le', 'p016le')
+
+
+def _plane_view(plane) -> np.ndarray:
+    """2D view of a frame plane, rows padded to line_size."""
+    return np.frombuffer(plane, np.uint8).reshape(-1, plane.line_size)
+
 
 class VideoReceiver:
     """Recibe y decodifica stream de video H.264"""
@@ -37,20 +89,41 @@ class VideoReceiver:
         self.is_running = False
         # Callback now receives (frame, orientation_degrees)
         self.frame_callback: Optional[Callable[[np.ndarray, int], None]] = None
+        # PyAV pixel format handed to the callback ('rgb24' or 'nv12')
+        self.frame_format = 'rgb24'
+        # Frame buffers handed back through release_frame(), reused for later frames
+        self._free_frames: deque = deque()
+        # Kept across frames so swscale reuses its context instead of rebuilding it
+        self._reformatter = VideoReformatter() if HAS_AV else None
         self.receive_thread: Optional[threading.Thread] = None
+        # Decoding runs on its own thread so a slow frame doesn't stall socket reads
+        self.decode_thread: Optional[threading.Thread] = None
+        self._packet_queue: Optional[queue.Queue] = None
 
         # Decodificador H.264
         self.codec_context: Optional[av.CodecContext] = None
+        # Hardware device type in use (None = software decoding). Only set once
+        # a frame has come out of the GPU: creating the HWAccel succeeds even
+        # without a usable device, and FFmpeg then silently decodes in software.
+        self.hw_device_type: Optional[str] = None
+        # Device type requested for the current decoder, and whether the first
+        # frame has told us if it is really in use
+        self._hw_requested: Optional[str] = None
+        self._decode_path_checked = False
+        self._allow_hwaccel = HAS_HWACCEL
         if HAS_AV:
             self._init_decoder()
 
     def _init_decoder(self):
         """Inicializa el decodificador H.264 con configuración de baja latencia"""
         try:
-            codec = av.CodecContext.create('h264', 'r')
+            codec = self._create_codec_context()
             # Dimensions are auto-detected from SPS/PPS in the stream
             # Enable error concealment for partial/corrupt frames
-            codec.thread_type = 'AUTO'
+            # Spread each frame's slices over every core. Frame threading is left
+            # off: it holds back thread_count - 1 frames, and low_delay disables it
+            codec.thread_count = os.cpu_count() or 0
+            codec.thread_type = 'SLICE'
 
             # === LOW LATENCY DECODER SETTINGS ===
             # Enable low_delay mode - don't wait for B-frames or reordering
@@ -63,10 +136,36 @@ class VideoReceiver:
             self.codec_context = codec
             self.decode_error_count = 0
             self.frames_decoded = 0
-            print(f"H.264 decoder initialized with low-latency settings")
+            self._decode_path_checked = False
+            requested = f"{self._hw_requested} requested" if self._hw_requested else "software"
+            print(f"H.264 decoder initialized with low-latency settings ({requested})")
         except Exception as e:
             print(f"Error initializing decoder: {e}")
 
+    def _create_codec_context(self):
+        """
+        Crea el contexto H.264, con aceleración por hardware si está disponible.
+
+        Hardware frames are downloaded to system memory as NV12, the format the
+        virtual camera takes, so no swscale conversion is needed on that path.
+        FFmpeg falls back to software by itself if the GPU can't decode the stream.
+        """
+        self.hw_device_type = None
+        self._hw_requested = None
+        if self._allow_hwaccel:
+            available = hwdevices_available()
+            for device_type in HW_DEVICE_TYPES:
+                if device_type not in available:
+                    continue
+                try:
+                    hwaccel = HWAccel(device_type=device_type, allow_software_fallback=True)
+                    codec = av.CodecContext.create('h264', 'r', hwaccel=hwaccel)
+                    self._hw_requested = device_type
+                    return codec
+                except Exception as e:
+                    print(f"Hardware decoder {device_type} unavailable: {e}")
+        return av.CodecContext.create('h264', 'r')
+
     def connect(self) -> bool:
         """
         Conecta al servidor Android
@@ -82,8 +181,11 @@ class VideoReceiver:
             # === LOW LATENCY NETWORK SETTINGS ===
             # TCP_NODELAY - receive immediately, no Nagle buffering
             self.socket.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
-            # Smaller buffers - 64KB (reduces latency)
-            self.socket.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, 65536)
+            # Large receive buffer (set before connect so the TCP window scales):
+            # a whole keyframe burst fits without stalling the sender. It adds
+            # no latency since we read as fast as data arrives.
+            self.socket.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, RECV_BUFFER_SIZE)
+            # We barely send anything - keep the send buffer small
             self.socket.setsockopt(socket.SOL_SOCKET, socket.SO_SNDBUF, 65536)
 
             # Crear contexto SSL
@@ -94,13 +196,16 @@ class VideoReceiver:
             # Conectar
             self.socket.connect((self.host, self.port))
 
-            # Envolver en SSL
+            # Envolver en SSL, reanudando la sesión anterior si la hay
+            # (TLS 1.3 PSK: sin verificar de nuevo el certificado del servidor)
             self.ssl_socket = ssl_context.wrap_socket(
                 self.socket,
-                server_hostname=self.host if self.cert_handler.cert_path else None
+                server_hostname=self.host if self.cert_handler.cert_path else None,
+                session=self.cert_handler.get_session(self.host, self.port, ssl_context)
             )
 
-            print(f"Conectado a {self.host}:{self.port}")
+            resumed = " (sesión TLS reanudada)" if self.ssl_socket.session_reused else ""
+            print(f"Conectado a {self.host}:{self.port}{resumed}")
             return True
 
         except Exception as e:
@@ -113,6 +218,8 @@ class VideoReceiver:
         self.is_running = False
 
         if self.ssl_socket:
+            # TLS 1.3 tickets arrive after the handshake, so grab the session last
+            self.cert_handler.store_session(self.host, self.port, self.ssl_socket)
             try:
                 self.ssl_socket.close()
             except:
@@ -128,6 +235,8 @@ class VideoReceiver:
 
         if self.receive_thread and self.receive_thread.is_alive():
             self.receive_thread.join(timeout=2)
+        if self.decode_thread and self.decode_thread.is_alive():
+            self.decode_thread.join(timeout=2)
 
     def start_receiving(self):
         """Inicia el hilo de recepción de datos"""
@@ -143,41 +252,61 @@ class VideoReceiver:
             self._init_decoder()
 
         self.is_running = True
-        self.receive_thread = threading.Thread(target=self._receive_loop, daemon=True)
+        self._packet_queue = queue.Queue(maxsize=PACKET_QUEUE_SIZE)
+        self.decode_thread = threading.Thread(
+            target=self._decode_loop, args=(self._packet_queue,), daemon=True
+        )
+        self.decode_thread.start()
+        self.receive_thread = threading.Thread(
+            target=self._receive_loop, args=(self._packet_queue,), daemon=True
+        )
         self.receive_thread.start()
 
-    def _receive_loop(self):
-        """Loop principal de recepción de datos"""
+    def _receive_loop(self, packets: queue.Queue):
+        """Loop principal de recepción de datos (solo lee y encola paquetes)"""
+        skip_until_keyframe = False
 
         while self.is_running and self.ssl_socket:
             try:
-                # Leer tamaño del paquete (4 bytes)
-                size_data = self._receive_exact(4)
-                if not size_data:
+                # Leer cabecera: tamaño del paquete (4 bytes) + byte de flags
+                # Protocol: [4 bytes size][1 byte flags][H.264 data], size counts
+                # the flags byte. Reading the flags with the size keeps them out of
+                # the H.264 buffer, which then goes to the decoder as is.
+                header = self._receive_exact(5)
+                if not header:
                     break
 
-                packet_size = struct.unpack('>I', size_data)[0]
+                packet_size = int.from_bytes(header[:4], 'big')
+                if packet_size < 1:
+                    break  # Malformed header: the stream is out of sync
 
-                # Leer datos del paquete (includes orientation byte + H.264 data)
-                packet_data = self._receive_exact(packet_size)
-                if not packet_data:
+                # Leer datos H.264 del paquete
+                h264_data = self._receive_exact(packet_size - 1)
+                if h264_data is None:
                     break
+                if not h264_data:
+                    continue  # Invalid packet
 
-                # Parse flags byte (first byte)
-                # Protocol: [1 byte flags][H.264 data]
+                # Parse flags byte
                 # flags: bits 0-1 = orientation (0=0°, 1=90°, 2=180°, 3=270°)
                 #        bit 7 = mirror flag (for front camera)
-                if len(packet_data) < 2:
-                    continue  # Invalid packet
-
-                flags_byte = packet_data[0]
+                flags_byte = header[4]
                 orientation_code = flags_byte & 0x03  # Only use lower 2 bits for orientation
                 mirror = (flags_byte & 0x80) != 0     # Bit 7 = mirror flag
                 orientation_degrees = orientation_code * 90
-                h264_data = packet_data[1:]
 
-                # Decodificar frame
-                self._decode_frame(h264_data, orientation_degrees, mirror)
+                # Latency first: once the decoder falls behind, drop everything up
+                # to the next keyframe (P-frames can't be decoded without the
+                # frames they reference, so dropping single packets won't do)
+                if packets.qsize() >= SKIP_BACKLOG:
+                    skip_until_keyframe = True
+                if skip_until_keyframe:
+                    if not _is_keyframe(h264_data):
+                        continue
+                    skip_until_keyframe = False
+
+                # Hand off to the decoder thread; each packet owns its buffer
+                self._enqueue_packet(packets, (h264_data, orientation_degrees, mirror))
 
             except Exception as e:
                 print(f"Error en loop de recepción: {e}")
@@ -186,27 +315,52 @@ class VideoReceiver:
         self.is_running = False
         print("Conexión cerrada")
 
-    def _receive_exact(self, size: int) -> Optional[bytes]:
-        """Recibe exactamente 'size' bytes"""
+    def _enqueue_packet(self, packets: queue.Queue, item: tuple):
+        """Encola un paquete, esperando mientras el decodificador va atrasado"""
+        while self.is_running:
+            try:
+                packets.put(item, timeout=0.5)
+                return
+            except queue.Full:
+                continue
+
+    def _decode_loop(self, packets: queue.Queue):
+        """Loop de decodificación: consume los paquetes encolados por _receive_loop"""
+        while self.is_running:
+            try:
+                h264_data, orientation_degrees, mirror = packets.get(timeout=0.5)
+            except queue.Empty:
+                continue
+            self._decode_frame(h264_data, orientation_degrees, mirror)
+
+    def _receive_exact(self, size: int) -> Optional[bytearray]:
+        """
+        Recibe exactamente 'size' bytes.
+
+        recv_into() writes each TLS record straight into one preallocated
+        buffer, with no per-chunk bytes objects, growth or final copy.
+        """
         if not self.ssl_socket:
             return None
 
-        data = bytearray()
-        while len(data) < size:
+        data = bytearray(size)
+        view = memoryview(data)
+        received = 0
+        while received < size:
             try:
-                chunk = self.ssl_socket.recv(size - len(data))
-                if not chunk:
+                n = self.ssl_socket.recv_into(view[received:])
+                if not n:
                     return None
-                data.extend(chunk)
+                received += n
             except socket.timeout:
                 continue
             except Exception as e:
                 print(f"Error al recibir datos: {e}")
                 return None
 
-        return bytes(data)
+        return data
 
-    def _decode_frame(self, h264_data: bytes, orientation_degrees: int = 0, mirror: bool = False):
+    def _decode_frame(self, h264_data: Union[bytes, bytearray], orientation_degrees: int = 0, mirror: bool = False):
         """Decodifica un frame H.264 usando PyAV"""
         if not self.frame_callback:
             return
@@ -229,9 +383,11 @@ class VideoReceiver:
                 self.frames_decoded += len(decoded_frames)
                 # Reset error count on successful decode
                 self.decode_error_count = 0
+                if not self._decode_path_checked:
+                    self._check_decode_path(frame)
 
-                # Convert frame to numpy array in RGB format
-                frame_array = frame.to_ndarray(format='rgb24')
+                # Copy into a numpy array (RGB, or NV12 as a (h*3/2, w) array)
+                frame_array = self._frame_to_array(frame)
 
                 # Call callback with decoded frame, orientation, and mirror flag
                 if self.frame_callback:
@@ -246,18 +402,123 @@ class VideoReceiver:
             # If too many consecutive errors, try reinitializing the decoder
             if self.decode_error_count >= 50:
                 print("Too many decode errors, reinitializing decoder...")
+                if self._hw_requested:
+                    # Don't keep retrying a GPU decoder that can't handle the stream
+                    self._allow_hwaccel = False
                 self._init_decoder()
         except Exception as e:
             print(f"Unexpected decode error: {e}")
 
-    def set_frame_callback(self, callback: Callable[[np.ndarray, int], None]):
+    def _check_decode_path(self, frame):
+        """Records, from the first decoded frame, whether the GPU decoder is really in use."""
+        self._decode_path_checked = True
+        if not self._hw_requested:
+            return
+        on_gpu = (frame.format.name in HW_DOWNLOAD_FORMATS
+                  and getattr(self.codec_context, 'is_hwaccel', True))
+        if on_gpu:
+            self.hw_device_type = self._hw_requested
+            print(f"Decoding on the GPU ({self.hw_device_type})")
+        else:
+            self.hw_device_type = None
+            print(f"Hardware decoder {self._hw_requested} not in use, "
+                  f"decoding in software (fallback)")
+
+    def _frame_to_array(self, frame) -> np.ndarray:
+        """
+        Copia los planos del frame a un buffer reciclado (ver release_frame)
+        en lugar de reservar un array nuevo por frame como to_ndarray().
+        """
+        if self.frame_format == 'nv12' and frame.format.name == 'yuv420p':
+            # Software decoder output: interleaving U/V by hand is a plain copy,
+            # ~3x cheaper than a swscale pass
+            return self._yuv420p_to_nv12(frame)
+
+        if HAS_LIBYUV and self.frame_format == 'rgb24' and frame.format.name in ('yuv420p', 'nv12'):
+            # SIMD conversion straight into the recycled buffer, instead of
+            # swscale into a temporary frame plus a copy
+            h, w = frame.height, frame.width
+            buf = self._frame_buffer((h, w, 3))
+            planes = [_plane_view(p) for p in frame.planes]
+            if len(planes) == 3:
+                i420_to_rgb(planes[0][:h, :w], planes[1], planes[2], buf)
+            else:
+                nv12_to_rgb(planes[0][:h, :w], planes[1], buf)
+            return buf
+
+        if frame.format.name != self.frame_format:
+            frame = self._reformatter.reformat(frame, format=self.frame_format)
+
+        h, w = frame.height, frame.width
+        if self.frame_format == 'nv12':
+            shape, row_bytes = (h * 3 // 2, w), w
+        elif self.frame_format == 'rgb24':
+            shape, row_bytes = (h, w, 3), w * 3
+        else:
+            return frame.to_ndarray()
+
+        buf = self._frame_buffer(shape)
+        rows = buf.reshape(-1, row_bytes)
+        row = 0
+        for plane in frame.planes:
+            # Planes may be padded past the visible width (line_size)
+            src = _plane_view(plane)
+            np.copyto(rows[row:row + plane.height], src[:plane.height, :row_bytes])
+            row += plane.height
+        return buf
+
+    def _yuv420p_to_nv12(self, frame) -> np.ndarray:
+        """Copia un frame YUV420P planar a un buffer NV12 (Y + UV entrelazado)."""
+        h, w = frame.height, frame.width
+        buf = self._frame_buffer((h * 3 // 2, w))
+        y_plane, u_plane, v_plane = frame.planes
+
+        if HAS_LIBYUV:
+            i420_to_nv12(_plane_view(y_plane)[:h, :w], _plane_view(u_plane),
+                         _plane_view(v_plane), buf)
+            return buf
+
+        src_y = _plane_view(y_plane)
+        np.copyto(buf[:h], src_y[:h, :w])
+
+        uv = buf[h:].reshape(h // 2, w // 2, 2)
+        for i, plane in enumerate((u_plane, v_plane)):
+            src = _plane_view(plane)
+            uv[..., i] = src[:h // 2, :w // 2]
+        return buf
+
+    def _frame_buffer(self, shape) -> np.ndarray:
+        """Devuelve un buffer liberado con la forma pedida, o uno nuevo."""
+        while True:
+            try:
+                buf = self._free_frames.popleft()
+            except IndexError:
+                return np.empty(shape, dtype=np.uint8)
+            if buf.shape == shape:
+                return buf
+            # Resolution changed: let the stale buffer go
+
+    def release_frame(self, frame: np.ndarray):
+        """
+        Devuelve al receptor un frame entregado al callback para reutilizarlo.
+
+        Optional: callbacks that keep frames (or never call this) still work,
+        every frame just gets a freshly allocated buffer.
+        """
+        self._free_frames.append(frame)
+
+    def set_frame_callback(self, callback: Callable[[np.ndarray, int], None],
+                           frame_format: str = 'rgb24'):
         """
         Establece el callback para recibir frames decodificados.
 
         Args:
             callback: Function that receives (frame: np.ndarray, orientation_degrees: int)
                       orientation_degrees: 0, 90, 180, or 270
+            frame_format: 'rgb24' (h, w, 3) or 'nv12' (h*3/2, w): NV12 skips the
+                          YUV->RGB conversion when the consumer takes YUV
         """
+        self.frame_format = frame_format
         self.frame_callback = callback
 
     def is_connected(self) -> bool:
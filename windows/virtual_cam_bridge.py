@@ -2,9 +2,10 @@
 Bridge to inject video frames into OBS-VirtualCam
 """
 import numpy as np
-from typing import Optional
+from typing import Dict, Optional, Tuple
 import pyvirtualcam
 from pyvirtualcam import PixelFormat
+from frame_kernels import HAS_NUMBA, nn_resize
 
 # Try to use OpenCV for faster resize (falls back to numpy if not available)
 try:
@@ -17,10 +18,19 @@ except ImportError:
 class VirtualCamBridge:
     """Bridge between video receiver and virtual camera"""
 
-    def __init__(self, width: int = 1280, height: int = 720, fps: int = 30):
+    def __init__(self, width: int = 1280, height: int = 720, fps: int = 30,
+                 pixel_format: str = "rgb24"):
         self.width = width
         self.height = height
         self.fps = fps
+        # "rgb24": (h, w, 3) RGB frames; "nv12": (h*3/2, w) Y plane + interleaved UV.
+        # NV12 is what OBS-VirtualCam uses internally, so it skips a conversion
+        # and moves half the bytes of RGB.
+        self.pixel_format = pixel_format
+        # Format the camera was actually opened with: not every pyvirtualcam
+        # backend takes NV12, and those get RGB converted from it in send_frame
+        self.camera_format: Optional[str] = None
+        self._rgb_frame: Optional[np.ndarray] = None
         self.camera: Optional[pyvirtualcam.Camera] = None
         self.is_running = False
 
@@ -28,6 +38,9 @@ class VirtualCamBridge:
         self._canvas: Optional[np.ndarray] = None
         self._last_frame_size: tuple = (0, 0)
         self._cached_scale_params: Optional[tuple] = None
+        self._interpolation: Optional[int] = None
+        # Nearest-neighbor row/column indices for _fast_resize, by (h, w, new_h, new_w)
+        self._nn_indices: Dict[Tuple[int, int, int, int], Tuple[np.ndarray, np.ndarray]] = {}
 
     def start(self) -> bool:
         """
@@ -36,20 +49,39 @@ class VirtualCamBridge:
         Returns:
             True if started successfully
         """
+        # Same format the decoder hands us; NV12 can fall back to RGB (needs cv2)
+        formats = [self.pixel_format]
+        if self.pixel_format == "nv12" and HAS_CV2:
+            formats.append("rgb24")
+
         try:
-            self.camera = pyvirtualcam.Camera(
-                width=self.width,
-                height=self.height,
-                fps=self.fps,
-                # Use RGB format - our decoder produces RGB frames
-                fmt=PixelFormat.RGB
-            )
+            for i, fmt in enumerate(formats):
+                try:
+                    self.camera = pyvirtualcam.Camera(
+                        width=self.width,
+                        height=self.height,
+                        fps=self.fps,
+                        fmt=PixelFormat.NV12 if fmt == "nv12" else PixelFormat.RGB
+                    )
+                except Exception as e:
+                    if i + 1 == len(formats):
+                        raise
+                    print(f"Virtual camera rejected {fmt} ({e}), retrying with {formats[i + 1]}")
+                    continue
+                self.camera_format = fmt
+                break
+            nv12 = self.camera_format == "nv12"
             self.is_running = True
 
-            # Pre-allocate canvas (black frame)
-            self._canvas = np.zeros((self.height, self.width, 3), dtype=np.uint8)
+            # Pre-allocate canvas; send_frame paints the bars black once it
+            # knows the input size (and skips that when there are no bars)
+            if nv12:
+                self._canvas = np.empty((self.height * 3 // 2, self.width), dtype=np.uint8)
+            else:
+                self._canvas = np.empty((self.height, self.width, 3), dtype=np.uint8)
 
-            print(f"Virtual camera started: {self.width}x{self.height} @ {self.fps}fps")
+            print(f"Virtual camera started: {self.width}x{self.height} @ {self.fps}fps "
+                  f"({self.camera_format})")
             return True
         except Exception as e:
             print(f"Error starting virtual camera: {e}")
@@ -62,14 +94,21 @@ class VirtualCamBridge:
         Optimized for low latency - minimal processing.
 
         Args:
-            frame: Frame as numpy array (RGB)
+            frame: Frame as numpy array (RGB, or NV12 if created with pixel_format="nv12")
         """
         if not self.is_running or not self.camera:
             return
 
         try:
+            if self.pixel_format != self.camera_format:
+                # NV12 frames for a camera opened as RGB
+                frame = self._nv12_to_rgb(frame)
+            nv12 = self.camera_format == "nv12"
+
             # Fast path: if frame matches target size exactly, send directly
             frame_h, frame_w = frame.shape[:2]
+            if nv12:
+                frame_h = frame_h * 2 // 3
 
             if frame_h == self.height and frame_w == self.width:
                 # Ensure contiguous memory for fastest send
@@ -89,21 +128,40 @@ class VirtualCamBridge:
                 new_h = int(frame_h * scale)
                 paste_x = (self.width - new_w) // 2
                 paste_y = (self.height - new_h) // 2
+                if nv12:
+                    # Chroma is subsampled 2x2: keep sizes and offsets even
+                    new_w, new_h = max(2, new_w & ~1), max(2, new_h & ~1)
+                    paste_x, paste_y = paste_x & ~1, paste_y & ~1
                 self._cached_scale_params = (new_w, new_h, paste_x, paste_y)
-                # Reset canvas to black
-                self._canvas.fill(0)
+                if HAS_CV2:
+                    # Area averaging when shrinking (no aliasing), bilinear when enlarging
+                    self._interpolation = cv2.INTER_AREA if scale < 1 else cv2.INTER_LINEAR
+                # Reset canvas to black, unless the image covers all of it
+                if (new_w, new_h) != (self.width, self.height):
+                    if nv12:
+                        self._canvas[:self.height] = 16   # Black in limited-range luma
+                        self._canvas[self.height:] = 128  # Neutral chroma
+                    else:
+                        self._canvas.fill(0)
 
             new_w, new_h, paste_x, paste_y = self._cached_scale_params
 
+            if nv12:
+                self._letterbox_nv12(frame, frame_h, new_w, new_h, paste_x, paste_y)
+                self.camera.send(self._canvas)
+                return
+
+            region = self._canvas[paste_y:paste_y+new_h, paste_x:paste_x+new_w]
+
             # Resize using OpenCV (much faster than PIL)
             if HAS_CV2:
-                resized = cv2.resize(frame, (new_w, new_h), interpolation=cv2.INTER_NEAREST)
+                region[...] = cv2.resize(frame, (new_w, new_h), interpolation=self._interpolation)
+            elif HAS_NUMBA:
+                # Fallback: compiled nearest neighbor, straight into the canvas
+                nn_resize(frame, region)
             else:
                 # Fallback: simple numpy resize (lower quality but fast)
-                resized = self._fast_resize(frame, new_w, new_h)
-
-            # Place resized frame on canvas (letterboxing)
-            self._canvas[paste_y:paste_y+new_h, paste_x:paste_x+new_w] = resized
+                region[...] = self._fast_resize(frame, new_w, new_h)
 
             # Send the canvas
             self.camera.send(self._canvas)
@@ -111,12 +169,43 @@ class VirtualCamBridge:
         except Exception as e:
             print(f"Error sending frame: {e}")
 
+    def _nv12_to_rgb(self, frame: np.ndarray) -> np.ndarray:
+        """Converts an NV12 frame to RGB in a buffer reused across frames."""
+        shape = (frame.shape[0] * 2 // 3, frame.shape[1], 3)
+        if self._rgb_frame is None or self._rgb_frame.shape != shape:
+            self._rgb_frame = np.empty(shape, dtype=np.uint8)
+        cv2.cvtColor(frame, cv2.COLOR_YUV2RGB_NV12, dst=self._rgb_frame)
+        return self._rgb_frame
+
+    def _letterbox_nv12(self, frame: np.ndarray, frame_h: int,
+                        new_w: int, new_h: int, paste_x: int, paste_y: int):
+        """Resizes both NV12 planes into their place on the canvas."""
+        h, w = self.height, self.width
+        src_y = frame[:frame_h]
+        src_uv = frame[frame_h:].reshape(frame_h // 2, frame.shape[1] // 2, 2)
+        dst_y = self._canvas[:h]
+        dst_uv = self._canvas[h:].reshape(h // 2, w // 2, 2)
+
+        for src, dst, x, y, cw, ch in (
+            (src_y, dst_y, paste_x, paste_y, new_w, new_h),
+            (src_uv, dst_uv, paste_x // 2, paste_y // 2, new_w // 2, new_h // 2),
+        ):
+            if HAS_CV2:
+                dst[y:y+ch, x:x+cw] = cv2.resize(src, (cw, ch), interpolation=self._interpolation)
+            else:
+                dst[y:y+ch, x:x+cw] = self._fast_resize(src, cw, ch)
+
     def _fast_resize(self, frame: np.ndarray, new_w: int, new_h: int) -> np.ndarray:
         """Fast numpy-based resize (nearest neighbor)"""
         h, w = frame.shape[:2]
-        y_indices = (np.arange(new_h) * h // new_h).astype(int)
-        x_indices = (np.arange(new_w) * w // new_w).astype(int)
-        return frame[y_indices[:, None], x_indices]
+        key = (h, w, new_h, new_w)
+        indices = self._nn_indices.get(key)
+        if indices is None:
+            # Computed once per input/output size, not per frame
+            y_indices = (np.arange(new_h) * h // new_h).astype(np.intp)
+            x_indices = (np.arange(new_w) * w // new_w).astype(np.intp)
+            indices = self._nn_indices[key] = (y_indices[:, None], x_indices)
+        return frame[indices]
 
     def stop(self):
         """Stops the virtual camera"""
@@ -129,7 +218,11 @@ class VirtualCamBridge:
 
         self.is_running = False
         self._canvas = None
+        self._rgb_frame = None
+        self.camera_format = None
         self._cached_scale_params = None
+        self._last_frame_size = (0, 0)
+        self._nn_indices.clear()
         print("Virtual camera stopped")
 
     def is_active(self) -> bool:
@@ -0,0 +1,71 @@
+"""
+YUV conversions through libyuv (optional, loaded with ctypes).
+
+libyuv has hand-written SSSE3/AVX2 row functions for the conversions the
+receiver needs and beats swscale on them. It isn't a Python package: put
+yuv.dll (Windows) or libyuv.so next to the app or on the library path. Without
+it HAS_LIBYUV is False and the receiver keeps its numpy/swscale paths.
+
+All functions take 2D uint8 plane views (row padding is fine, the strides are
+passed through) and write into preallocated, C-contiguous destinations.
+"""
+
+import ctypes
+import ctypes.util
+
+import numpy as np
+
+_lib = None
+for _name in ("yuv", "libyuv"):
+    _path = ctypes.util.find_library(_name)
+    if _path:
+        try:
+            _lib = ctypes.CDLL(_path)
+            break
+        except OSError:
+            pass
+
+_c_int = ctypes.c_int
+_c_ptr = ctypes.c_void_p
+
+
+def _bind(name, n_planes_in, n_planes_out):
+    func = getattr(_lib, name, None)
+    if func is not None:
+        # (data, stride) per input and output plane, then width, height
+        func.argtypes = [_c_ptr, _c_int] * (n_planes_in + n_planes_out) + [_c_int, _c_int]
+        func.restype = _c_int
+    return func
+
+
+if _lib is not None:
+    _I420ToNV12 = _bind("I420ToNV12", 3, 2)
+    # libyuv's "RAW" is R, G, B in memory order ("RGB24" is B, G, R)
+    _I420ToRAW = _bind("I420ToRAW", 3, 1)
+    _NV12ToRAW = _bind("NV12ToRAW", 2, 1)
+    HAS_LIBYUV = None not in (_I420ToNV12, _I420ToRAW, _NV12ToRAW)
+else:
+    HAS_LIBYUV = False
+
+
+def _plane(arr: np.ndarray):
+    return arr.ctypes.data, arr.strides[0]
+
+
+def i420_to_nv12(y: np.ndarray, u: np.ndarray, v: np.ndarray, dst: np.ndarray) -> None:
+    """Interleaves planar YUV 4:2:0 into dst, an (h*3/2, w) NV12 buffer."""
+    h, w = y.shape
+    _I420ToNV12(*_plane(y), *_plane(u), *_plane(v),
+                dst.ctypes.data, w, dst.ctypes.data + h * w, w, w, h)
+
+
+def i420_to_rgb(y: np.ndarray, u: np.ndarray, v: np.ndarray, dst: np.ndarray) -> None:
+    """Converts planar YUV 4:2:0 (BT.601 limited range) into dst, an (h, w, 3) RGB buffer."""
+    h, w = y.shape
+    _I420ToRAW(*_plane(y), *_plane(u), *_plane(v), dst.ctypes.data, w * 3, w, h)
+
+
+def nv12_to_rgb(y: np.ndarray, uv: np.ndarray, dst: np.ndarray) -> None:
+    """Converts NV12 (uv is the (h/2, w) interleaved plane) into dst, an (h, w, 3) RGB buffer."""
+    h, w = y.shape
+    _NV12ToRAW(*_plane(y), *_plane(uv), dst.ctypes.data, w * 3, w, h)